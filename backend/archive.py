@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from .config import TASK_ARCHIVE_AFTER_DAYS, TASK_ARCHIVE_BATCH_SIZE
+from .extensions import db
+from .models import Task, TaskArchive, User
+
+
+# ----- Hot/cold task storage -----
+# `task` holds what listings and the change feed work on; completed tasks
+# older than TASK_ARCHIVE_AFTER_DAYS move to `task_archive`. Each batch is
+# its own short transaction (copy, delete, bump the owners' versions), so
+# the job never holds write locks for long and can be stopped at any time.
+
+ARCHIVE_COLUMNS = (
+    "id", "user_id", "description", "estimated", "completed",
+    "timestamp", "completed_at", "assigned_by_admin",
+)
+
+
+def _archive_batch(cutoff: datetime, batch_size: int):
+    """
+    Move one batch. Returns (found, moved): whether any due task was
+    selected, and how many were moved; the two differ when tasks were
+    toggled back to pending in between.
+    """
+    due = (Task.completed.is_(True), Task.completed_at < cutoff)
+    ids = db.session.execute(
+        db.select(Task.id).where(*due).order_by(Task.completed_at).limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        db.session.rollback()
+        return False, 0
+
+    # DELETE ... RETURNING re-checks each row as it goes, so a task toggled
+    # back to pending since the SELECT stays where it is
+    now = datetime.utcnow()
+    rows = db.session.execute(
+        db.delete(Task)
+        .where(Task.id.in_(ids), *due)
+        .returning(*(getattr(Task, c) for c in ARCHIVE_COLUMNS))
+        .execution_options(synchronize_session=False)
+    ).all()
+    if rows:
+        db.session.execute(db.insert(TaskArchive), [
+            {**row._asdict(), "archived_at": now} for row in rows
+        ])
+    user_ids = sorted({row.user_id for row in rows})
+
+    # The moved tasks leave the owners' listings and change feed: a new
+    # version refreshes cached pages, and raising sync_floor to it makes
+    # browser caches resync from the (now smaller) hot table instead of
+    # being sent a tombstone per archived task
+    db.session.execute(
+        db.update(User)
+        .where(User.id.in_(user_ids))
+        .values(data_version=User.data_version + 1, sync_floor=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return True, len(rows)
+
+
+def optimize_storage(vacuum: bool = False):
+    """
+    Refresh planner statistics after a large move. On SQLite, `vacuum`
+    also rebuilds the file to return the freed pages to the filesystem;
+    that takes an exclusive lock for the duration, so leave it for quiet
+    hours. Postgres reclaims space through autovacuum.
+    """
+    db.session.commit()
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if db.engine.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE task"))
+            conn.execute(text("ANALYZE task_archive"))
+            if vacuum:
+                conn.execute(text("VACUUM"))
+        elif db.engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE task"))
+            conn.execute(text("ANALYZE task_archive"))
+
+
+def archive_completed_tasks(days: int = TASK_ARCHIVE_AFTER_DAYS,
+                            batch_size: int = TASK_ARCHIVE_BATCH_SIZE,
+                            pause: float = 0.0, limit=None) -> int:
+    """
+    Move tasks completed more than `days` ago into task_archive, at most
+    `batch_size` per transaction, sleeping `pause` seconds between batches
+    so request traffic gets the write lock in between. Stops after `limit`
+    tasks if given. Returns the number moved.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    moved = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        found, count = _archive_batch(cutoff, size)
+        moved += count
+        if not found:
+            break
+        if pause:
+            time.sleep(pause)
+    return moved
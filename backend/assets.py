@@ -0,0 +1,222 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import subprocess
+
+from flask import current_app, request, send_from_directory
+
+from .config import ASSET_MAX_AGE, TAILWIND_BIN
+
+
+# ----- Static asset pipeline -----
+# `flask build-assets` compiles the Tailwind stylesheet from the templates,
+# then copies every file under static/ into static/dist/ with a hash of its
+# content in the name, writes .br/.gz siblings for text files and records
+# the mapping in dist/manifest.json. With a manifest present,
+# url_for("static", filename="css/styles.css") resolves to the hashed copy,
+# which never changes and is served with a year-long immutable
+# Cache-Control. Without one (a checkout that was never built) URLs and
+# responses are Flask's defaults. A rebuild keeps the previous build's
+# hashed files, so pages rendered by workers that have not restarted yet
+# still find their assets.
+
+DIST_DIR = "dist"
+MANIFEST_FILE = "manifest.json"
+TAILWIND_OUTPUT = "css/tailwind.css"
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))     # in order of preference
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def compile_tailwind(static_folder: str):
+    """Compile frontend/tailwind.css against the templates, minified."""
+    binary = TAILWIND_BIN
+    if not binary:
+        try:
+            from tailwindcss_bin import find_tailwindcss_bin
+        except ImportError:
+            raise RuntimeError(
+                "building the stylesheet needs the 'tailwindcss-bin' package or TAILWIND_BIN"
+            )
+        binary = find_tailwindcss_bin()
+    frontend = os.path.dirname(os.path.abspath(static_folder))
+    result = subprocess.run(
+        [
+            binary,
+            "--input", os.path.join(frontend, "tailwind.css"),
+            "--output", os.path.join(static_folder, TAILWIND_OUTPUT),
+            "--minify",
+        ],
+        cwd=frontend,
+    )
+    if result.returncode:
+        raise RuntimeError(f"tailwindcss exited with status {result.returncode}")
+
+
+def _source_files(static_folder: str):
+    """Paths under static/ relative to it, '/'-separated; CSS last."""
+    names = []
+    for root, dirs, files in os.walk(static_folder):
+        rel = os.path.relpath(root, static_folder)
+        if rel == DIST_DIR:
+            dirs.clear()
+            continue
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith((".br", ".gz")):
+                names.append(posixpath.normpath(posixpath.join(rel.replace(os.sep, "/"), name)))
+    # CSS goes last so its url() references can be pointed at hashed copies
+    return sorted(names, key=lambda name: name.endswith(".css"))
+
+
+def _rewrite_css_urls(css: str, name: str, hashed_dir: str, files: dict) -> str:
+    """Re-point relative url() references from the copy's place in dist/."""
+    def replace(match):
+        ref = match.group(2).strip()
+        if re.match(r"^([a-z][a-z0-9+.-]*:|/|#)", ref, re.I):
+            return match.group(0)
+        path, suffix = re.match(r"([^?#]*)(.*)", ref).groups()
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(name), path))
+        # Files outside the manifest are still referenced where they are
+        target = files.get(target, target)
+        return f'url("{posixpath.relpath(target, hashed_dir)}{suffix}")'
+    return CSS_URL.sub(replace, css)
+
+
+def _write_compressed(path: str, data: bytes) -> list:
+    """Write whichever precompressed variants come out smaller; their encodings."""
+    variants = [("gzip", ".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+    except ImportError:
+        pass    # gzip only; install 'Brotli' for .br files
+    else:
+        variants.insert(0, ("br", ".br", brotli.compress(data, quality=11)))
+    written = []
+    for encoding, suffix, compressed in variants:
+        if len(compressed) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+            written.append(encoding)
+    return written
+
+
+def _read_manifest(dist: str):
+    try:
+        with open(os.path.join(dist, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _prune_dist(dist: str, keep: set):
+    """Remove files under dist/ that are not in `keep` (names relative to static/)."""
+    for root, _, files in os.walk(dist):
+        for name in files:
+            path = os.path.join(root, name)
+            rel = posixpath.join(DIST_DIR, os.path.relpath(path, dist).replace(os.sep, "/"))
+            base = rel[:-3] if rel.endswith((".br", ".gz")) else rel
+            if name != MANIFEST_FILE and base not in keep:
+                os.remove(path)
+
+
+def fingerprint_assets(static_folder: str) -> dict:
+    """
+    Write hashed copies of the files under static/ to static/dist and
+    replace its manifest, keeping the files of the build before this one
+    and removing older ones. Returns the manifest: {"files": {name: hashed
+    name}, "encodings": {hashed name: [encoding, ...]}}.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    previous = _read_manifest(dist) or {"files": {}}
+    files, encodings = {}, {}
+    for name in _source_files(static_folder):
+        with open(os.path.join(static_folder, name), "rb") as f:
+            data = f.read()
+        hashed_dir = posixpath.join(DIST_DIR, posixpath.dirname(name))
+        if name.endswith(".css"):
+            data = _rewrite_css_urls(data.decode(), name, hashed_dir, files).encode()
+
+        stem, ext = posixpath.splitext(posixpath.basename(name))
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        hashed = posixpath.join(hashed_dir, f"{stem}.{digest}{ext}")
+        path = os.path.join(static_folder, *hashed.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        files[name] = hashed
+        if ext in COMPRESSIBLE:
+            encodings[hashed] = _write_compressed(path, data)
+        else:
+            encodings[hashed] = []
+
+    manifest = {"files": files, "encodings": encodings}
+    # Swapped in whole: a worker starting mid-build reads one or the other
+    tmp = os.path.join(dist, MANIFEST_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(dist, MANIFEST_FILE))
+    _prune_dist(dist, set(files.values()) | set(previous["files"].values()))
+    return manifest
+
+
+class StaticAssets:
+    """
+    Resolves static filenames to their fingerprinted copies and serves
+    those with immutable caching and precompressed bodies. The manifest is
+    read once, in init_app; restart after `flask build-assets`.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.encodings = {}
+        self.digest = ""    # of the file mapping; part of page ETags
+
+    def init_app(self, app):
+        manifest = _read_manifest(os.path.join(app.static_folder, DIST_DIR))
+        if manifest is None:
+            return
+        self.digest = hashlib.sha1(
+            json.dumps(manifest["files"], sort_keys=True).encode()
+        ).hexdigest()[:10]
+        self.files = manifest["files"]
+        self.encodings = manifest["encodings"]
+        app.url_defaults(self._fingerprint)
+        app.view_functions["static"] = self.send
+
+    def _fingerprint(self, endpoint, values):
+        if endpoint == "static":
+            hashed = self.files.get(values.get("filename"))
+            if hashed:
+                values["filename"] = hashed
+
+    def send(self, filename):
+        available = self.encodings.get(filename)
+        if available is None:
+            return current_app.send_static_file(filename)
+
+        served, encoding = filename, None
+        for name, suffix in ENCODINGS:
+            if name in available and request.accept_encodings[name]:
+                served, encoding = filename + suffix, name
+                break
+        response = send_from_directory(
+            current_app.static_folder, served,
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            max_age=ASSET_MAX_AGE,
+        )
+        if encoding:
+            response.content_encoding = encoding
+        if available:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+static_assets = StaticAssets()
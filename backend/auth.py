@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import func, or_
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .config import (
+    AUTH_ACCOUNT_BURST, AUTH_ACCOUNT_PER_MINUTE, AUTH_HASH_QUEUE, AUTH_HASH_WORKERS,
+    AUTH_IP_BURST, AUTH_IP_PER_MINUTE, AUTH_LIMITER_SIZE, AUTH_RATE_LIMIT,
+    AUTH_RATE_REDIS_URL, PASSWORD_HASH_METHOD,
+)
+from .metrics import auth_rejections, password_hash_seconds
+from .models import User
+
+
+class AuthBusy(Exception):
+    """Every password hashing slot in this process is taken."""
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+# ----- Lookup -----
+def find_login_user(identifier: str):
+    """
+    The user whose username is `identifier`, or else whose email matches it
+    case-insensitively; one query, each side served by its own unique index
+    (user.username, ix_user_email_lower).
+    """
+    if not identifier:
+        return None
+    users = User.query.filter(or_(
+        User.username == identifier,
+        func.lower(User.email) == identifier.lower(),
+    )).limit(2).all()
+    # One user's username can be another's email address: the username wins
+    return next((u for u in users if u.username == identifier), users[0] if users else None)
+
+
+# ----- Hashing -----
+# PBKDF2 and scrypt hold a core for tens to hundreds of milliseconds but
+# release the GIL, so they run on native threads: under gevent the worker
+# keeps serving other requests meanwhile, and per process no more than
+# AUTH_HASH_WORKERS hashes run at once. Callers beyond the queue limit get
+# AuthBusy straight away instead of piling up behind a login burst.
+
+def hash_password(password: str) -> str:
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+
+_target_prefix = None
+
+
+def needs_rehash(stored: str) -> bool:
+    """Whether `stored` was made with other parameters than PASSWORD_HASH_METHOD."""
+    global _target_prefix
+    if _target_prefix is None:
+        _target_prefix = hash_password("").split("$", 1)[0]
+    return stored.split("$", 1)[0] != _target_prefix
+
+
+def _check(stored: str, password: str):
+    started = time.perf_counter()
+    valid = check_password_hash(stored, password)
+    upgraded = hash_password(password) if valid and needs_rehash(stored) else None
+    return valid, upgraded, time.perf_counter() - started
+
+
+def _hash(password: str):
+    started = time.perf_counter()
+    return hash_password(password), time.perf_counter() - started
+
+
+class HashPool:
+    def __init__(self, workers=AUTH_HASH_WORKERS, queue=AUTH_HASH_QUEUE):
+        self.workers = workers
+        self.queue = queue
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.workers = app.config.get("AUTH_HASH_WORKERS", self.workers)
+        self.queue = app.config.get("AUTH_HASH_QUEUE", self.queue)
+
+    def _ensure_executor(self):
+        # Created lazily and per process: threads do not survive a fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            try:
+                from gevent import monkey
+                patched = monkey.is_module_patched("threading")
+            except ImportError:
+                patched = False
+            if patched:
+                # Native threads whose futures only block the waiting greenlet
+                from gevent.threadpool import ThreadPoolExecutor
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+            self._slots = threading.BoundedSemaphore(self.workers + self.queue)
+            self._pid = os.getpid()
+
+    def run(self, fn, *args):
+        self._ensure_executor()
+        if not self._slots.acquire(blocking=False):
+            auth_rejections.inc(reason="busy")
+            raise AuthBusy()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def check(self, user, password: str) -> bool:
+        """
+        Verify `password` against the user's hash. A hash made with older
+        parameters is replaced (not committed) when the password is right.
+        """
+        valid, upgraded, seconds = self.run(_check, user.password, password)
+        password_hash_seconds.observe(seconds, op="check")
+        if upgraded:
+            user.password = upgraded
+        return valid
+
+    def hash(self, password: str) -> str:
+        hashed, seconds = self.run(_hash, password)
+        password_hash_seconds.observe(seconds, op="hash")
+        return hashed
+
+
+# ----- Rate limiting -----
+# Token buckets: each key holds up to `burst` attempts and regains
+# per_minute of them a minute. In memory they are per process; with
+# AUTH_RATE_REDIS_URL one script call per attempt updates a shared bucket.
+
+TOKEN_BUCKET_LUA = """
+local burst, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1e6
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or burst
+local at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - at) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+RATE_KEY_PREFIX = "pomoweb:auth-rate:"
+
+
+class RateLimiter:
+    def __init__(self, maxsize=AUTH_LIMITER_SIZE):
+        self.maxsize = maxsize
+        self.enabled = AUTH_RATE_LIMIT
+        self._buckets = OrderedDict()    # key -> (tokens, monotonic time)
+        self._lock = threading.Lock()
+        self._script = None
+
+    def init_app(self, app):
+        self.maxsize = app.config.get("AUTH_LIMITER_SIZE", self.maxsize)
+        self.enabled = app.config.get("AUTH_RATE_LIMIT", self.enabled)
+        url = app.config.get("AUTH_RATE_REDIS_URL", AUTH_RATE_REDIS_URL)
+        if url:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError(
+                    "AUTH_RATE_REDIS_URL is set but the 'redis' package is not installed"
+                )
+            self._script = redis.Redis.from_url(url).register_script(TOKEN_BUCKET_LUA)
+
+    def hit(self, key: str, burst: int, per_minute: float) -> float:
+        """Take a token from `key`'s bucket; seconds until one is free, 0 if taken."""
+        rate = per_minute / 60
+        if self._script is not None:
+            return float(self._script(keys=[RATE_KEY_PREFIX + key], args=[burst, rate]))
+        now = time.monotonic()
+        with self._lock:
+            tokens, at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - at) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def check_attempt(self, ip: str, account=None):
+        """
+        Charge a sign-in attempt to the client IP and, if given, the account
+        it names (before any lookup, so unknown names are throttled alike).
+        Raises RateLimited when either bucket is empty.
+        """
+        if not self.enabled:
+            return
+        wait = self.hit(f"ip:{ip}", AUTH_IP_BURST, AUTH_IP_PER_MINUTE)
+        if not wait and account:
+            wait = self.hit(f"account:{account.lower()}", AUTH_ACCOUNT_BURST, AUTH_ACCOUNT_PER_MINUTE)
+        if wait:
+            auth_rejections.inc(reason="rate")
+            raise RateLimited(wait)
+
+
+hash_pool = HashPool()
+rate_limiter = RateLimiter()
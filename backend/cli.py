@@ -0,0 +1,163 @@
+import socket
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .archive import archive_completed_tasks, optimize_storage
+from .assets import compile_tailwind, fingerprint_assets
+from .auth import hash_password
+from .config import (
+    MAIL_BATCH_SIZE, MAIL_POLL_INTERVAL, MAIL_TIMEOUT, TASK_ARCHIVE_AFTER_DAYS,
+    TASK_ARCHIVE_BATCH_SIZE, TOMBSTONE_RETENTION_DAYS,
+)
+from .datagen import generate_dataset
+from .extensions import db
+from .models import User
+from .outbox import deliver_outbox_batch
+from .reporting import rebuild_daily_stats
+from .sync import prune_tombstones
+from .user_cache import user_cache
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db():
+    """Create any missing tables (use `flask db upgrade` for existing databases)."""
+    db.create_all()
+    click.echo(f"Database ready at {db.engine.url.render_as_string(hide_password=True)}")
+
+
+@click.command("seed-admin")
+@click.option("--username", default="admin", show_default=True)
+@click.option("--email", default="admin@example.com", show_default=True)
+@click.option("--password", envvar="ADMIN_PASSWORD", default="admin123",
+              help="Defaults to $ADMIN_PASSWORD, then 'admin123'.")
+@click.option("--reset", is_flag=True, help="Reset the password if the user already exists.")
+@with_appcontext
+def seed_admin(username, email, password, reset):
+    """Create the admin user if it does not exist."""
+    admin = User.query.filter_by(username=username).first()
+    if admin and not reset:
+        click.echo("Admin already exists")
+        return
+
+    if admin:
+        admin.is_admin = True
+        admin.password = hash_password(password)
+        click.echo(f"Admin password reset: {username}")
+    else:
+        db.session.add(User(
+            username=username,
+            email=email,
+            password=hash_password(password),
+            is_admin=True
+        ))
+        click.echo(f"Admin user created: {username}")
+    db.session.commit()
+    if admin:
+        user_cache.invalidate(admin.id)
+
+
+@click.command("report-backfill")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's rollup.")
+@with_appcontext
+def report_backfill(user_id):
+    """Rebuild the daily report rollup from the task history."""
+    rows = rebuild_daily_stats(user_id)
+    click.echo(f"Rebuilt {rows} daily report rows.")
+
+
+@click.command("seed-data")
+@click.option("--users", type=int, default=100, show_default=True)
+@click.option("--tasks", "tasks_per_user", type=int, default=100, show_default=True,
+              help="Tasks per user.")
+@click.option("--days", type=int, default=90, show_default=True,
+              help="Spread task history over this many days.")
+@click.option("--completed-ratio", type=float, default=0.6, show_default=True)
+@click.option("--prefix", default="bench", show_default=True, help="Username prefix.")
+@click.option("--password", default="bench123", show_default=True)
+@click.option("--seed", type=int, default=None, help="Random seed for a repeatable dataset.")
+@with_appcontext
+def seed_data(users, tasks_per_user, days, completed_ratio, prefix, password, seed):
+    """Generate a synthetic dataset of users and tasks for benchmarking."""
+    started = time.perf_counter()
+    created_users, created_tasks = generate_dataset(
+        users, tasks_per_user, days, completed_ratio, prefix, password, seed
+    )
+    click.echo(
+        f"Created {created_users} users and {created_tasks} tasks "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+
+
+@click.command("prune-tombstones")
+@click.option("--days", type=int, default=TOMBSTONE_RETENTION_DAYS, show_default=True,
+              help="Keep tombstones of tasks deleted within this many days.")
+@with_appcontext
+def prune_tombstones_command(days):
+    """Delete old deleted-task tombstones kept for delta sync."""
+    removed = prune_tombstones(days)
+    click.echo(f"Removed {removed} tombstones.")
+
+
+@click.command("archive-tasks")
+@click.option("--days", type=int, default=TASK_ARCHIVE_AFTER_DAYS, show_default=True,
+              help="Archive tasks completed more than this many days ago.")
+@click.option("--batch-size", type=int, default=TASK_ARCHIVE_BATCH_SIZE, show_default=True,
+              help="Tasks moved per transaction.")
+@click.option("--pause", type=float, default=0.05, show_default=True,
+              help="Seconds to sleep between batches.")
+@click.option("--limit", type=int, default=None, help="Stop after this many tasks.")
+@click.option("--vacuum", is_flag=True, help="SQLite: VACUUM afterwards (locks the database).")
+@with_appcontext
+def archive_tasks(days, batch_size, pause, limit, vacuum):
+    """Move old completed tasks into the archive table."""
+    started = time.perf_counter()
+    moved = archive_completed_tasks(days, batch_size, pause, limit)
+    if moved or vacuum:
+        optimize_storage(vacuum)
+    click.echo(f"Archived {moved} tasks in {time.perf_counter() - started:.1f}s.")
+
+
+@click.command("build-assets")
+@click.option("--skip-tailwind", is_flag=True,
+              help="Fingerprint the static files as they are, without compiling Tailwind.")
+@with_appcontext
+def build_assets(skip_tailwind):
+    """Compile the stylesheet and write fingerprinted, precompressed copies to static/dist."""
+    static_folder = current_app.static_folder
+    if not skip_tailwind:
+        try:
+            compile_tailwind(static_folder)
+        except Exception as e:
+            raise click.ClickException(f"Tailwind build failed: {e}")
+    manifest = fingerprint_assets(static_folder)
+    compressed = sum(len(v) for v in manifest["encodings"].values())
+    click.echo(f"Fingerprinted {len(manifest['files'])} assets, wrote {compressed} precompressed variants.")
+
+
+@click.command("mail-worker")
+@click.option("--once", is_flag=True, help="Send one batch and exit.")
+@click.option("--batch-size", type=int, default=MAIL_BATCH_SIZE, show_default=True)
+@click.option("--poll-interval", type=float, default=MAIL_POLL_INTERVAL, show_default=True)
+@with_appcontext
+def mail_worker(once, batch_size, poll_interval):
+    """Deliver queued outbox email."""
+    socket.setdefaulttimeout(MAIL_TIMEOUT)
+    while True:
+        claimed = deliver_outbox_batch(batch_size)
+        if once:
+            click.echo(f"Processed {claimed} message(s).")
+            return
+        if claimed < batch_size:
+            time.sleep(poll_interval)
+
+
+def register_commands(app):
+    for command in (
+        init_db, seed_admin, report_backfill, seed_data, prune_tombstones_command,
+        archive_tasks, build_assets, mail_worker,
+    ):
+        app.cli.add_command(command)
@@ -0,0 +1,120 @@
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+
+class Config:
+    SECRET_KEY = os.getenv("SECRET_KEY", "your_super_secret_key")
+
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        "DATABASE_URL",
+        "sqlite:///users.db"
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+    MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
+    MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "true").lower() in ("1", "true", "yes")
+    MAIL_USE_SSL = False
+    MAIL_USERNAME = os.getenv("MAIL_USERNAME")
+    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
+    MAIL_DEFAULT_SENDER = os.getenv("MAIL_FROM", os.getenv("MAIL_USERNAME"))
+
+    # Adds an X-Query-Count header to every response (used by benchmark.py)
+    QUERY_COUNT_HEADER = os.getenv("QUERY_COUNT_HEADER", "").lower() in ("1", "true", "yes")
+
+
+# Outbox worker (`flask mail-worker`)
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 50))
+MAIL_POLL_INTERVAL = float(os.getenv("MAIL_POLL_INTERVAL", 5))
+MAIL_TIMEOUT = float(os.getenv("MAIL_TIMEOUT", 30))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 8))
+MAIL_RETRY_BASE = 30      # seconds; doubles per attempt
+MAIL_RETRY_MAX = 3600
+
+SESSION_BATCH_MAX = 100
+SESSION_MODES = {"pomodoro", "short", "long"}
+
+ADMIN_TASKS_PER_PAGE = int(os.getenv("ADMIN_TASKS_PER_PAGE", 50))
+ADMIN_USER_TASKS_LIMIT = int(os.getenv("ADMIN_USER_TASKS_LIMIT", 200))
+TASKS_PAGE_SIZE = int(os.getenv("TASKS_PAGE_SIZE", 20))
+TASKS_PAGE_SIZE_MAX = 100
+TASK_BATCH_MAX = 100
+
+# Flask-Login user loader cache (see user_cache.py)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
+
+# Rendered task-list fragments (see page_cache.py)
+FRAGMENT_CACHE_BYTES = int(os.getenv("FRAGMENT_CACHE_BYTES", 16 * 1024 * 1024))
+
+# Database engine profile (see db_engine.py). DB_PROFILE is "auto" (pick by
+# DATABASE_URL), "sqlite", "postgres" or "none" for SQLAlchemy defaults.
+DB_PROFILE = os.getenv("DB_PROFILE", "auto")
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))    # ms
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", 64 * 1024))
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", 128 * 1024 * 1024))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", 15000))         # ms
+DB_IDLE_TX_TIMEOUT = int(os.getenv("DB_IDLE_TX_TIMEOUT", 60000))             # ms
+
+# Read engine for analytical routes (see db_routing.py): a replica at
+# DATABASE_READ_URL, or for a SQLite file a second, query_only pool on the
+# same file. After a request that wrote, the client's reads stay on the
+# primary for DB_READ_PIN_SECONDS so it sees its own changes.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+DB_READ_ROUTING = os.getenv("DB_READ_ROUTING", "true").lower() in ("1", "true", "yes")
+DB_READ_PIN_SECONDS = float(os.getenv("DB_READ_PIN_SECONDS", 5))
+
+# Instrumentation (see metrics.py). /metrics requires "Authorization: Bearer
+# <METRICS_TOKEN>" and answers 404 when no token is set.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 250))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))      # 0 disables
+PROFILE_THRESHOLD_MS = float(os.getenv("PROFILE_THRESHOLD_MS", 500))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Live task updates over Server-Sent Events (see events.py)
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL")
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))          # per open stream
+EVENTS_KEEPALIVE = float(os.getenv("EVENTS_KEEPALIVE", 20))            # seconds
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", 3000))
+EVENTS_STREAM_SECONDS = float(os.getenv("EVENTS_STREAM_SECONDS", 300))
+
+# Task history export (see export.py)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 2000))      # rows per cursor fetch
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", 64 * 1024))
+
+# Delta sync (see sync.py)
+TASK_CHANGES_PAGE_SIZE = int(os.getenv("TASK_CHANGES_PAGE_SIZE", 500))   # rows per /api/tasks/changes
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", 30))
+
+# Archival of old completed tasks (see archive.py, `flask archive-tasks`)
+TASK_ARCHIVE_AFTER_DAYS = int(os.getenv("TASK_ARCHIVE_AFTER_DAYS", 180))   # since completion
+TASK_ARCHIVE_BATCH_SIZE = int(os.getenv("TASK_ARCHIVE_BATCH_SIZE", 1000))  # tasks per transaction
+
+# Static assets (see assets.py, `flask build-assets`)
+TAILWIND_BIN = os.getenv("TAILWIND_BIN")              # standalone CLI; tailwindcss-bin's if unset
+ASSET_MAX_AGE = int(os.getenv("ASSET_MAX_AGE", 365 * 24 * 3600))   # fingerprinted files
+
+# Authentication (see auth.py). Password hashes run in a small thread pool
+# per process; requests beyond AUTH_HASH_WORKERS + AUTH_HASH_QUEUE are
+# refused rather than queued. Attempts are also rate limited per client IP
+# and per account (token buckets: BURST attempts, refilled at PER_MINUTE).
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")   # werkzeug method; older hashes upgrade on login
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", 2))
+AUTH_HASH_QUEUE = int(os.getenv("AUTH_HASH_QUEUE", 8))
+AUTH_RATE_LIMIT = os.getenv("AUTH_RATE_LIMIT", "true").lower() in ("1", "true", "yes")
+AUTH_IP_BURST = int(os.getenv("AUTH_IP_BURST", 20))
+AUTH_IP_PER_MINUTE = float(os.getenv("AUTH_IP_PER_MINUTE", 10))
+AUTH_ACCOUNT_BURST = int(os.getenv("AUTH_ACCOUNT_BURST", 10))
+AUTH_ACCOUNT_PER_MINUTE = float(os.getenv("AUTH_ACCOUNT_PER_MINUTE", 5))
+AUTH_LIMITER_SIZE = int(os.getenv("AUTH_LIMITER_SIZE", 100000))      # buckets kept in memory
+AUTH_RATE_REDIS_URL = os.getenv("AUTH_RATE_REDIS_URL")               # share buckets across workers
+# Behind a reverse proxy (Heroku's router, nginx) the client address comes
+# from X-Forwarded-For; set to the number of proxies in front of the app
+PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", 0))
@@ -1,4 +1,7 @@
-from app import db, app
+from backend.app import create_app
+from backend.extensions import db
+
+app = create_app()
 
 with app.app_context():
     db.create_all()
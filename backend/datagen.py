@@ -0,0 +1,99 @@
+import random
+from datetime import datetime, timedelta
+
+from .auth import hash_password
+from .extensions import db
+from .models import User, Task
+from .page_cache import mark_users_changed
+from .reporting import rebuild_daily_stats
+
+
+# ----- Synthetic dataset for benchmarks (`flask seed-data`) -----
+INSERT_CHUNK = 5000
+
+WORDS = (
+    "write", "review", "plan", "fix", "draft", "read", "refactor", "test",
+    "email", "design", "outline", "study", "call", "update", "prepare",
+)
+SUBJECTS = (
+    "report", "chapter 3", "slides", "budget", "release notes", "API docs",
+    "onboarding guide", "lab results", "grant proposal", "sprint backlog",
+)
+
+
+def _description(rng) -> str:
+    return f"{rng.choice(WORDS).capitalize()} {rng.choice(SUBJECTS)}"
+
+
+def _task_rows(rng, user_id: int, count: int, days: int, completed_ratio: float, now: datetime):
+    for _ in range(count):
+        # Skewed towards recent days, like a live account
+        created = now - timedelta(seconds=days * 86400 * rng.random() ** 2)
+        completed_at = None
+        if rng.random() < completed_ratio:
+            # Mostly done within a few hours, with a long tail of days
+            done = created + timedelta(hours=rng.lognormvariate(0.5, 1.2))
+            completed_at = min(done, now)
+        yield {
+            "user_id": user_id,
+            "description": _description(rng),
+            "estimated": rng.choice((1, 1, 1, 2, 2, 3, 4)),
+            "completed": completed_at is not None,
+            "timestamp": created,
+            "completed_at": completed_at,
+            "assigned_by_admin": rng.random() < 0.05,
+        }
+
+
+def _insert_chunked(table, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK:
+            db.session.execute(db.insert(table), chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(db.insert(table), chunk)
+
+
+def generate_dataset(users: int, tasks_per_user: int, days: int = 90,
+                     completed_ratio: float = 0.6, prefix: str = "bench",
+                     password: str = "bench123", seed=None):
+    """
+    Bulk-insert `users` accounts named <prefix>0..<prefix>N-1 (all sharing
+    `password`) with `tasks_per_user` tasks each, spread over the last
+    `days` days, then rebuild the report rollup. Existing accounts with
+    those names are left alone. Returns (users created, tasks created).
+    """
+    rng = random.Random(seed)
+    names = [f"{prefix}{i}" for i in range(users)]
+    existing = {
+        name for (name,) in
+        db.session.query(User.username).filter(User.username.startswith(prefix))
+    }
+    new_names = [n for n in names if n not in existing]
+
+    # One hash for everyone: hashing per user would dominate the run
+    hashed = hash_password(password)
+    _insert_chunked(User, (
+        {"username": n, "email": f"{n}@example.com", "password": hashed, "is_admin": False}
+        for n in new_names
+    ))
+    db.session.flush()
+
+    now = datetime.utcnow()
+    wanted = set(new_names)
+    ids = [
+        uid for (uid, name) in
+        db.session.query(User.id, User.username).filter(User.username.startswith(prefix))
+        if name in wanted
+    ]
+    _insert_chunked(Task, (
+        row for uid in ids
+        for row in _task_rows(rng, uid, tasks_per_user, days, completed_ratio, now)
+    ))
+    # Stamps the new tasks' change_seq, as for tasks added through the app
+    mark_users_changed(ids)
+    db.session.commit()
+    rebuild_daily_stats()
+    return len(ids), len(ids) * tasks_per_user
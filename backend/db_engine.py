@@ -0,0 +1,80 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from .config import (
+    DB_PROFILE, SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_KB, SQLITE_MMAP_BYTES,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_STATEMENT_TIMEOUT, DB_IDLE_TX_TIMEOUT,
+)
+
+
+# ----- Engine profiles -----
+# create_app() passes engine_options() to Flask-SQLAlchemy as
+# SQLALCHEMY_ENGINE_OPTIONS (unless the config already sets them) and then
+# calls configure_engine() on each engine it created. The read engine (see
+# db_routing) gets the same profile with read_only=True.
+
+def resolve_profile(uri: str, profile: str = DB_PROFILE) -> str:
+    if profile != "auto":
+        return profile
+    backend = make_url(uri).get_backend_name()
+    if backend == "sqlite":
+        return "sqlite"
+    if backend == "postgresql":
+        return "postgres"
+    return "none"
+
+
+def engine_options(uri: str, profile: str = DB_PROFILE, read_only: bool = False) -> dict:
+    profile = resolve_profile(uri, profile)
+    if profile == "sqlite":
+        # pysqlite's own lock wait, in seconds; busy_timeout below covers
+        # statements run outside its implicit transactions.
+        return {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT / 1000}}
+    if profile == "postgres":
+        options = f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"
+        options += f" -c idle_in_transaction_session_timeout={DB_IDLE_TX_TIMEOUT}"
+        if read_only:
+            options += " -c default_transaction_read_only=on"
+        return {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+            # Reuse the most recent connection so surplus ones idle out
+            "pool_use_lifo": True,
+            "connect_args": {"options": options},
+        }
+    return {}
+
+
+def configure_engine(engine, profile: str = DB_PROFILE, read_only: bool = False):
+    if resolve_profile(str(engine.url), profile) == "sqlite":
+        event.listen(engine, "connect", _sqlite_pragmas)
+        if read_only:
+            event.listen(engine, "connect", _sqlite_query_only)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers proceed while one worker writes; NORMAL sync is safe in
+    WAL mode (a crash can lose the last commits but not corrupt the file);
+    busy_timeout makes a second writer wait for the lock instead of failing
+    with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _sqlite_query_only(dbapi_connection, connection_record):
+    """Refuse writes on the read engine's connections (set after the WAL switch)."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
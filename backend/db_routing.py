@@ -0,0 +1,116 @@
+import functools
+import time
+from contextlib import contextmanager
+
+from flask import current_app, has_request_context, request, session as client_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+
+from .config import DATABASE_READ_URL, DB_READ_PIN_SECONDS, DB_READ_ROUTING
+from .db_engine import engine_options
+
+
+# ----- Read/write routing -----
+# Reporting and admin listings can read from a second engine, the "read"
+# bind: a Postgres replica at DATABASE_READ_URL, or for a SQLite file a
+# separate query_only pool on the same WAL-mode file, so long reads never
+# hold the connections interactive task writes need. Routing is opt-in per
+# view (@read_engine_route) or block (with use_read_engine()); everything
+# else, and anything that writes, stays on the primary.
+
+READ_BIND = "read"
+ROUTE_READS = "route_reads"     # session.info keys
+WROTE = "wrote"
+PIN_KEY = "_db_primary_until"   # client_session: read-your-writes window
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to the read engine while reads are routed and the
+    session has not written during the request. Flushes, DML, SELECT ...
+    FOR UPDATE and textual SQL go to the primary, and once a write has been
+    seen the rest of the request reads from the primary too.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or getattr(clause, "is_dml", False):
+                self.info[WROTE] = True
+            elif (
+                self.info.get(ROUTE_READS)
+                and not self.info.get(WROTE)
+                and getattr(clause, "is_select", False)
+                and getattr(clause, "_for_update_arg", None) is None
+            ):
+                engine = self._db.engines.get(READ_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _session():
+    return current_app.extensions["sqlalchemy"].session()
+
+
+def _pinned() -> bool:
+    return has_request_context() and client_session.get(PIN_KEY, 0) > time.time()
+
+
+@contextmanager
+def use_read_engine():
+    """Route the SELECTs in this block to the read engine."""
+    info = _session().info
+    previous = info.get(ROUTE_READS)
+    info[ROUTE_READS] = not _pinned()
+    try:
+        yield
+    finally:
+        info[ROUTE_READS] = previous
+
+
+def read_engine_route(view):
+    """
+    Route a view's reads to the read engine on GET and HEAD. It applies to
+    the rest of the request, so a streamed response body reads there too.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method in ("GET", "HEAD") and not _pinned():
+            _session().info[ROUTE_READS] = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class ReadRouting:
+    def __init__(self):
+        self.pin_seconds = 0
+
+    def init_app(self, app):
+        """Register the read bind; call before db.init_app(app)."""
+        if not app.config.get("DB_READ_ROUTING", DB_READ_ROUTING):
+            return
+        primary = app.config["SQLALCHEMY_DATABASE_URI"]
+        replica = app.config.get("DATABASE_READ_URL", DATABASE_READ_URL)
+        if replica:
+            # A replica lags the primary: a client that just wrote keeps
+            # reading from the primary for a few seconds
+            self.pin_seconds = app.config.get("DB_READ_PIN_SECONDS", DB_READ_PIN_SECONDS)
+            url = replica
+        else:
+            parsed = make_url(primary)
+            if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+                return
+            url = primary
+        binds = app.config.setdefault("SQLALCHEMY_BINDS", {})
+        binds.setdefault(READ_BIND, {"url": url, **engine_options(url, read_only=True)})
+        if self.pin_seconds:
+            app.after_request(self._pin_after_write)
+
+    def _pin_after_write(self, response):
+        scoped = current_app.extensions["sqlalchemy"].session
+        if scoped.registry.has() and scoped().info.get(WROTE):
+            client_session[PIN_KEY] = time.time() + self.pin_seconds
+        return response
+
+
+read_routing = ReadRouting()
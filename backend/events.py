@@ -0,0 +1,237 @@
+import json
+import os
+import queue
+import threading
+import time
+
+from flask import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import (
+    EVENTS_REDIS_URL, EVENTS_QUEUE_SIZE, EVENTS_KEEPALIVE, EVENTS_RETRY_MS, EVENTS_STREAM_SECONDS,
+)
+from .extensions import db
+
+
+EVENTS_CHANNEL_PREFIX = "pomoweb:events:"
+ADMIN_CHANNEL = "admin"
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+# ----- Publishing from task mutations -----
+# task_ops queues events on the session; they are serialised just before
+# commit (so new tasks have ids) and published only once it succeeds.
+
+def task_payload(task) -> dict:
+    return {
+        "id": task.id,
+        "user_id": task.user_id,
+        "description": task.description,
+        "estimated": task.estimated,
+        "completed": bool(task.completed),
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+        "assigned_by_admin": bool(task.assigned_by_admin),
+    }
+
+
+def queue_task_event(kind: str, task):
+    """kind is 'created' or 'updated'; the task is read at commit time."""
+    db.session.info.setdefault("task_events", []).append((kind, task))
+
+
+def queue_task_deleted(task):
+    db.session.info.setdefault("task_events", []).append(
+        ("deleted", {"id": task.id, "user_id": task.user_id})
+    )
+
+
+def queue_tasks_assigned(user_ids, description: str, estimated: int):
+    db.session.info.setdefault("task_events", []).append(
+        ("assigned", {"user_ids": list(user_ids), "description": description, "estimated": estimated})
+    )
+
+
+def _messages(kind, item):
+    if kind == "assigned":
+        data = {"description": item["description"], "estimated": item["estimated"]}
+        for uid in item["user_ids"]:
+            yield user_channel(uid), {"type": "tasks.assigned", **data}
+        yield ADMIN_CHANNEL, {"type": "tasks.assigned", "count": len(item["user_ids"]), **data}
+        return
+    task = item if kind == "deleted" else task_payload(item)
+    message = {"type": f"task.{kind}", "task": task}
+    yield user_channel(task["user_id"]), message
+    yield ADMIN_CHANNEL, message
+
+
+@event.listens_for(Session, "before_commit")
+def _serialise_task_events(session):
+    pending = session.info.pop("task_events", None)
+    if not pending:
+        return
+    session.flush()
+    session.info["outgoing_events"] = [
+        message for kind, item in pending for message in _messages(kind, item)
+    ]
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_task_events(session):
+    outgoing = session.info.pop("outgoing_events", None)
+    if outgoing:
+        broker.publish(outgoing)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_task_events(session, previous_transaction):
+    session.info.pop("task_events", None)
+    session.info.pop("outgoing_events", None)
+
+
+# ----- Broker -----
+class Subscription:
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = queue.Queue(EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # A stalled client: drop what it has not read and tell it to resync
+            self.overflowed = True
+
+
+class EventBroker:
+    """
+    Fans task events out to open SSE streams. Without EVENTS_REDIS_URL only
+    streams in the publishing process see an event, which is enough for a
+    single worker; with it, events go through Redis pub/sub and each worker
+    delivers them to its own subscribers.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener_pid = None
+
+    def init_app(self, app):
+        url = app.config.get("EVENTS_REDIS_URL", EVENTS_REDIS_URL)
+        if url:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError(
+                    "EVENTS_REDIS_URL is set but the 'redis' package is not installed"
+                )
+            self._redis = redis.Redis.from_url(url)
+
+    def publish(self, messages):
+        if self._redis is None:
+            for channel, message in messages:
+                self._deliver(channel, message)
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for channel, message in messages:
+            pipe.publish(EVENTS_CHANNEL_PREFIX + channel, json.dumps(message))
+        pipe.execute()
+
+    def subscribe(self, channel: str) -> Subscription:
+        self._ensure_listener()
+        sub = Subscription(channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+    def _deliver(self, channel, message):
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for sub in subs:
+            sub.deliver(message)
+
+    def _ensure_listener(self):
+        # Per process, like the user cache listener, so forked workers each
+        # get their own.
+        if self._redis is None or self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(target=self._listen, name="task-events", daemon=True).start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(EVENTS_CHANNEL_PREFIX + "*")
+                for raw in pubsub.listen():
+                    channel = raw["channel"].decode()[len(EVENTS_CHANNEL_PREFIX):]
+                    try:
+                        self._deliver(channel, json.loads(raw["data"]))
+                    except ValueError:
+                        continue
+            except Exception:
+                # Lost the connection: events published meanwhile are gone,
+                # so ask every open stream to resync.
+                with self._lock:
+                    subs = [s for group in self._subscribers.values() for s in group]
+                for sub in subs:
+                    sub.overflowed = True
+                time.sleep(1)
+
+
+broker = EventBroker()
+
+
+# ----- Server-Sent Events -----
+def _sse(event_type: str, data) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream(channel: str) -> Response:
+    """
+    A text/event-stream response relaying `channel`. It holds no database
+    connection while open, sends a comment every EVENTS_KEEPALIVE seconds
+    (which also detects closed clients) and ends after EVENTS_STREAM_SECONDS;
+    EventSource reconnects on its own and the page then resyncs.
+    """
+    sub = broker.subscribe(channel)
+
+    def stream():
+        deadline = time.monotonic() + EVENTS_STREAM_SECONDS
+        try:
+            yield f"retry: {EVENTS_RETRY_MS}\n\n"
+            while time.monotonic() < deadline:
+                if sub.overflowed:
+                    sub.overflowed = False
+                    while not sub.queue.empty():
+                        sub.queue.get_nowait()
+                    yield _sse("resync", {})
+                try:
+                    message = sub.queue.get(timeout=EVENTS_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(message["type"], message)
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
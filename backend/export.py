@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, date, timedelta
+
+from flask import Response, stream_with_context
+
+from .config import EXPORT_BATCH_SIZE, EXPORT_CHUNK_BYTES
+from .extensions import db
+from .models import Task, TaskArchive, User
+
+
+EXPORT_COLUMNS = (
+    "id", "user_id", "description", "estimated", "completed",
+    "timestamp", "completed_at", "assigned_by_admin",
+)
+DATETIME_COLUMNS = ("timestamp", "completed_at")
+EXPORT_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def parse_date_arg(value):
+    """YYYY-MM-DD query argument to a date; None if absent, ValueError if bad."""
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
+
+def _export_select(model, user_id, since, until, with_username):
+    # Labelled, so the union's ORDER BY can name them on SQLite too
+    columns = [getattr(model, c).label(c) for c in EXPORT_COLUMNS]
+    if with_username:
+        columns.insert(2, User.username.label("username"))
+    stmt = db.select(*columns)
+    if with_username:
+        stmt = stmt.join(User, User.id == model.user_id)
+    if user_id is not None:
+        stmt = stmt.where(model.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(model.timestamp >= datetime.combine(since, datetime.min.time()))
+    if until is not None:
+        stmt = stmt.where(model.timestamp < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+    return stmt
+
+
+def export_query(user_id=None, since=None, until=None, with_username=False):
+    """
+    Column SELECT for an export (no ORM entities, so nothing accumulates in
+    the identity map), over both live and archived tasks. One user's tasks
+    come in (timestamp, id) order from the (user_id, timestamp) index of
+    each table; admin-wide exports in primary key order. `until` is
+    inclusive.
+    """
+    stmt = db.union_all(*(
+        _export_select(model, user_id, since, until, with_username)
+        for model in (Task, TaskArchive)
+    ))
+    columns = stmt.selected_columns
+    if user_id is not None:
+        stmt = stmt.order_by(columns.timestamp, columns.id)
+    else:
+        stmt = stmt.order_by(columns.id)
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE, stream_results=True)
+
+
+def _formatted(header, rows):
+    """Rows as lists with datetimes rendered; only those columns are touched."""
+    positions = [i for i, name in enumerate(header) if name in DATETIME_COLUMNS]
+    for row in rows:
+        row = list(row)
+        for i in positions:
+            if row[i] is not None:
+                row[i] = row[i].isoformat(" ", "seconds")
+        yield row
+
+
+def _csv_chunks(header, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    for row in _formatted(header, rows):
+        writer.writerow(row)
+        if buf.tell() >= EXPORT_CHUNK_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _ndjson_chunks(header, rows):
+    rows = _formatted(header, rows)
+    first = next(rows, None)
+    if first is None:
+        return
+    # The first row goes out alone so the download starts at once
+    yield json.dumps(dict(zip(header, first))) + "\n"
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps(dict(zip(header, row))) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(parts)
+            parts, size = [], 0
+    yield "".join(parts)
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)   # gzip container
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if first:
+            # Flush the header row through at once so the download starts
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(fmt: str, stmt, filename: str, compress: bool = False) -> Response:
+    """
+    Streamed CSV or NDJSON response for an export_query() statement. Rows
+    are fetched EXPORT_BATCH_SIZE at a time from a server-side cursor and
+    written out in ~EXPORT_CHUNK_BYTES pieces, optionally gzipped on the
+    fly, so memory stays flat however many rows there are.
+    """
+    def generate():
+        # The connection the statement is routed to (the read engine under
+        # @read_engine_route), so the SET LOCAL applies to its transaction
+        conn = db.session.connection(bind_arguments={"clause": stmt})
+        if conn.dialect.name == "postgresql":
+            # A slow reader leaves the cursor's transaction idle between fetches
+            conn.execute(db.text("SET LOCAL idle_in_transaction_session_timeout = 0"))
+        result = conn.execute(stmt)
+        header = list(result.keys())
+        chunks = (_csv_chunks if fmt == "csv" else _ndjson_chunks)(header, result)
+        if compress:
+            yield from _gzip(chunks)
+        else:
+            for chunk in chunks:
+                if chunk:
+                    yield chunk.encode()
+        result.close()
+        db.session.rollback()
+
+    filename = f"{filename}.{fmt}" + (".gz" if compress else "")
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/gzip" if compress else EXPORT_MIMETYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
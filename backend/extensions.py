@@ -0,0 +1,14 @@
+from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+from flask_login import LoginManager
+from flask_mail import Mail
+
+from .db_routing import RoutingSession
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+migrate = Migrate()
+mail = Mail()
+
+login_manager = LoginManager()
+login_manager.login_view = "main.login"
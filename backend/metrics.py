@@ -0,0 +1,261 @@
+import cProfile
+import hmac
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, abort, g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+
+from .config import (
+    METRICS_TOKEN, SLOW_QUERY_MS, PROFILE_SAMPLE_RATE, PROFILE_THRESHOLD_MS, PROFILE_DIR,
+)
+
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+# ----- Prometheus-format metric types -----
+def _label_value(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_label_value(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set. Observations are counted into
+    the first bucket whose upper bound is >= the value, and rendered as
+    Prometheus' cumulative _bucket/_sum/_count series.
+    """
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}     # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                labels = _labels(self.labelnames, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+request_seconds = Histogram(
+    "pomoweb_request_duration_seconds", "Wall time per request.",
+    ("endpoint", "method", "status"),
+)
+request_queries = Histogram(
+    "pomoweb_request_db_queries", "SQL statements executed per request.",
+    ("endpoint",), COUNT_BUCKETS,
+)
+request_query_seconds = Histogram(
+    "pomoweb_request_db_seconds", "Total SQL execution time per request.",
+    ("endpoint",),
+)
+template_seconds = Histogram(
+    "pomoweb_template_render_seconds", "Time to render a template, including its includes.",
+    ("template",),
+)
+password_hash_seconds = Histogram(
+    "pomoweb_password_hash_seconds", "Time spent hashing or checking passwords.",
+    ("op",), (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+auth_rejections = Counter(
+    "pomoweb_auth_rejected_total", "Sign-in attempts refused before hashing (rate limit or busy).",
+    ("reason",),
+)
+slow_queries = Counter(
+    "pomoweb_db_slow_queries_total", f"SQL statements slower than {SLOW_QUERY_MS} ms.",
+    ("endpoint",),
+)
+
+REGISTRY = (
+    request_seconds, request_queries, request_query_seconds,
+    template_seconds, password_hash_seconds, auth_rejections, slow_queries,
+)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# ----- Flask and SQLAlchemy hooks -----
+def _endpoint():
+    return request.endpoint or "unmatched"
+
+
+class Metrics:
+    """
+    Request, SQL and template instrumentation plus the /metrics endpoint.
+
+    Values live in each process; under gunicorn every worker keeps its own
+    series, so scrape each worker (or aggregate) rather than relying on one
+    response to cover the whole server.
+    """
+
+    def init_app(self, app, engines):
+        self.query_count_header = app.config.get("QUERY_COUNT_HEADER", False)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._stop_profiler)
+        before_render_template.connect(self._template_started, app)
+        template_rendered.connect(self._template_finished, app)
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._query_started)
+            event.listen(engine, "after_cursor_execute", self._query_finished)
+        app.add_url_rule("/metrics", "metrics", self._metrics_view)
+
+    # Requests
+    def _start_request(self):
+        g.query_count = 0
+        g.query_seconds = 0.0
+        g.request_started = time.perf_counter()
+        if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process; skip
+                # this sample while another request is being profiled.
+                return
+            g.profiler = profiler
+
+    def _finish_request(self, response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = _endpoint()
+        if endpoint != "metrics":
+            request_seconds.observe(elapsed, endpoint=endpoint, method=request.method,
+                                    status=response.status_code)
+            request_queries.observe(g.query_count, endpoint=endpoint)
+            request_query_seconds.observe(g.query_seconds, endpoint=endpoint)
+        if self.query_count_header:
+            response.headers["X-Query-Count"] = str(g.query_count)
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            if elapsed * 1000 >= PROFILE_THRESHOLD_MS:
+                self._dump_profile(profiler, endpoint, elapsed)
+        return response
+
+    def _stop_profiler(self, exc):
+        # Requests that raised never reach after_request
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+
+    def _dump_profile(self, profiler, endpoint, elapsed):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(
+            PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{elapsed * 1000:.0f}ms.prof"
+        )
+        profiler.dump_stats(path)
+        log.warning("Slow request %s %s took %.0f ms; profile written to %s",
+                    request.method, request.path, elapsed * 1000, path)
+
+    # SQL
+    def _query_started(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _query_finished(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        in_request = has_request_context()
+        if in_request and "query_count" in g:
+            g.query_count += 1
+            g.query_seconds += elapsed
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            endpoint = _endpoint() if in_request else "-"
+            slow_queries.inc(endpoint=endpoint)
+            log.warning("Slow query (%.0f ms) in %s: %s", elapsed * 1000, endpoint,
+                        " ".join(statement.split()))
+
+    # Templates
+    def _template_started(self, sender, template, context, **extra):
+        g.setdefault("template_started", []).append(time.perf_counter())
+
+    def _template_finished(self, sender, template, context, **extra):
+        stack = g.get("template_started")
+        if stack:
+            template_seconds.observe(time.perf_counter() - stack.pop(),
+                                     template=template.name or "<string>")
+
+    def _metrics_view(self):
+        # Endpoint names, statuses and timings are not for the public: with
+        # no token configured the endpoint does not exist
+        if not METRICS_TOKEN:
+            abort(404)
+        given = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(given.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            return Response("Unauthorized\n", 401, {"WWW-Authenticate": "Bearer"})
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+metrics = Metrics()
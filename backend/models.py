@@ -0,0 +1,194 @@
+from datetime import datetime
+from flask_login import UserMixin
+from sqlalchemy import func
+from sqlalchemy.dialects import sqlite as sqlite_dialect, postgresql as pg_dialect
+
+from .extensions import db, login_manager
+from .user_cache import user_cache
+
+
+
+# Models
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(150), unique=True, nullable=False)
+    email = db.Column(db.String(255), unique=True, nullable=True)
+    password = db.Column(db.String(255), nullable=False)
+    is_admin = db.Column(db.Boolean, default=False)
+    # Bumped whenever one of the user's tasks changes; drives page ETags
+    # and the /api/tasks/changes cursor
+    data_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    # Tombstones at or below this version have been pruned; change cursors
+    # older than it must start over from a full snapshot
+    sync_floor = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+
+    tasks = db.relationship("Task", back_populates="user", lazy=True)
+
+
+class Task(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    description = db.Column(db.String(255), nullable=False)
+    estimated = db.Column(db.Integer, default=1)          
+    completed = db.Column(db.Boolean, default=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    completed_at = db.Column(db.DateTime, nullable=True)
+    assigned_by_admin = db.Column(db.Boolean, default=False, nullable=False)
+    # Owner's data_version as of the last commit that changed this task;
+    # task_ops sets it to NULL and the commit stamps it (see page_cache)
+    change_seq = db.Column(db.Integer, nullable=True)
+    # UUID from the browser for tasks added offline, so a replayed add is
+    # not stored twice
+    client_id = db.Column(db.String(36), nullable=True)
+
+    user = db.relationship("User", back_populates="tasks")
+
+    archived = False    # see TaskArchive
+
+    __table_args__ = (
+        db.Index("ix_task_user_completed_timestamp", "user_id", "completed", "timestamp"),
+        db.Index("ix_task_user_timestamp", "user_id", "timestamp"),
+        db.Index("ix_task_user_change_seq", "user_id", "change_seq"),
+        db.Index("ix_task_user_client_id", "user_id", "client_id", unique=True),
+        # Finds archival candidates without scanning the table
+        db.Index("ix_task_completed_at", "completed_at"),
+        # Ids are never reused on SQLite either: a deleted or archived
+        # task's id stays its tombstone's or task_archive row's
+        {"sqlite_autoincrement": True},
+    )
+
+
+class TaskArchive(db.Model):
+    """
+    Completed tasks moved out of `task` by `flask archive-tasks`, keeping
+    their ids. Read-only: listings, exports and report rebuilds read it
+    alongside `task`.
+    """
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    description = db.Column(db.String(255), nullable=False)
+    estimated = db.Column(db.Integer, default=1)
+    completed = db.Column(db.Boolean, default=True)
+    timestamp = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    assigned_by_admin = db.Column(db.Boolean, default=False, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    archived = True
+
+    __table_args__ = (
+        db.Index("ix_task_archive_user_timestamp", "user_id", "timestamp"),
+    )
+
+
+class TaskTombstone(db.Model):
+    """
+    Left behind by a deleted task so /api/tasks/changes can report the
+    deletion. change_seq is stamped like Task.change_seq. Old tombstones are
+    removed by `flask prune-tombstones`.
+    """
+    task_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    change_seq = db.Column(db.Integer, nullable=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_task_tombstone_user_change_seq", "user_id", "change_seq"),
+    )
+
+
+# login and /forgot look users up by lower(email)
+db.Index("ix_user_email_lower", func.lower(User.email))
+
+
+class DailyTaskStat(db.Model):
+    """
+    Per-user, per-day (UTC) task rollup read by /report. Maintained
+    incrementally by the task endpoints; rebuild with `flask report-backfill`.
+    Created/estimated count toward the day a task was created, completed and
+    latency toward the day it was completed.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tasks_created = db.Column(db.Integer, default=0, nullable=False)
+    tasks_completed = db.Column(db.Integer, default=0, nullable=False)
+    estimated_pomodoros = db.Column(db.Integer, default=0, nullable=False)
+    completion_seconds = db.Column(db.Float, default=0, nullable=False)
+
+
+class OutboxMessage(db.Model):
+    """
+    Outgoing email written in the request transaction and delivered by the
+    `flask mail-worker` process, so requests never wait on SMTP.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    html = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(16), default="pending", nullable=False)   # pending | sent | failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_outbox_message_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class PomodoroSession(db.Model):
+    """
+    One finished timer interval reported by the browser. client_id is a
+    UUID generated client-side so retried batches are not stored twice.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    # A task or task_archive id. No foreign key: archiving moves the task
+    # under the same id, and ids are never reused, so the link outlives
+    # both archiving and deletion (a deleted task's id resolves to nothing)
+    task_id = db.Column(db.Integer, nullable=True)
+    client_id = db.Column(db.String(36), nullable=False)
+    mode = db.Column(db.String(16), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False)
+    ended_at = db.Column(db.DateTime, nullable=False)
+    duration = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "client_id", name="uq_pomodoro_session_user_client"),
+        db.Index("ix_pomodoro_session_user_started", "user_id", "started_at"),
+    )
+
+
+@login_manager.user_loader
+def load_user(user_id: str):
+    """
+    Served from user_cache when possible, so authenticated requests skip the
+    primary-key lookup; otherwise loads only the cached columns.
+    """
+    user_id = int(user_id)
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    row = (
+        db.session.query(User.id, User.username, User.is_admin)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return user_cache.put(row.id, row.username, row.is_admin)
+
+
+def upsert_insert():
+    """
+    The dialect's insert() construct supporting ON CONFLICT, or None when the
+    database has no such clause.
+    """
+    return {
+        "sqlite": sqlite_dialect.insert,
+        "postgresql": pg_dialect.insert,
+    }.get(db.engine.dialect.name)
@@ -0,0 +1,75 @@
+import smtplib
+from datetime import datetime, timedelta
+from flask_mail import Message
+
+from .config import MAIL_BATCH_SIZE, MAIL_TIMEOUT, MAIL_MAX_ATTEMPTS, MAIL_RETRY_BASE, MAIL_RETRY_MAX
+from .extensions import db, mail
+from .models import OutboxMessage
+
+
+def claim_outbox_batch(limit: int) -> list:
+    """
+    Due outbox messages for this worker. Claimed rows get their
+    next_attempt_at pushed out as a lease, so other workers skip them and a
+    crashed worker's batch becomes due again once the lease expires.
+    """
+    now = datetime.utcnow()
+    messages = (
+        OutboxMessage.query
+        .filter(OutboxMessage.status == "pending", OutboxMessage.next_attempt_at <= now)
+        .order_by(OutboxMessage.next_attempt_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    lease = now + timedelta(seconds=MAIL_TIMEOUT * (len(messages) + 1))
+    for m in messages:
+        m.next_attempt_at = lease
+    db.session.commit()
+    return messages
+
+
+def schedule_retry(message, error: str):
+    message.attempts += 1
+    message.last_error = error[:1000]
+    if message.attempts >= MAIL_MAX_ATTEMPTS:
+        message.status = "failed"
+        return
+    delay = min(MAIL_RETRY_BASE * 2 ** (message.attempts - 1), MAIL_RETRY_MAX)
+    message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+
+def deliver_outbox_batch(limit: int = MAIL_BATCH_SIZE) -> int:
+    """
+    Send one batch of due messages over a single SMTP connection.
+    Returns the number of messages claimed.
+    """
+    messages = claim_outbox_batch(limit)
+    if not messages:
+        return 0
+
+    try:
+        with mail.connect() as conn:
+            for m in messages:
+                try:
+                    conn.send(Message(
+                        subject=m.subject,
+                        recipients=[m.recipient],
+                        body=m.body,
+                        html=m.html,
+                    ))
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError,
+                        smtplib.SMTPSenderRefused) as e:
+                    schedule_retry(m, repr(e))
+                else:
+                    m.status = "sent"
+                    m.sent_at = datetime.utcnow()
+                    m.attempts += 1
+    except (OSError, smtplib.SMTPException) as e:
+        # Connection-level failure: retry everything not yet sent
+        for m in messages:
+            if m.status == "pending":
+                schedule_retry(m, repr(e))
+
+    db.session.commit()
+    return len(messages)
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, make_response, render_template
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .assets import static_assets
+from .config import FRAGMENT_CACHE_BYTES
+from .extensions import db
+from .models import User, Task, TaskTombstone
+
+
+# ----- Per-user data version -----
+# user.data_version changes whenever one of the user's tasks does. Task
+# mutations call mark_user_changed(); the bump happens once per user in the
+# committing transaction, however many tasks it touched. The tasks and
+# tombstones the transaction wrote (left with change_seq NULL) are then
+# stamped with the new version, which makes it a change sequence: the
+# UPDATE on the user row serialises that user's commits, so versions are
+# handed out in commit order.
+
+VERSION_BUMP_CHUNK = 1000
+
+
+def mark_user_changed(user_id: int):
+    db.session.info.setdefault("changed_users", set()).add(user_id)
+
+
+def mark_users_changed(user_ids):
+    db.session.info.setdefault("changed_users", set()).update(user_ids)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_data_versions(session):
+    changed = session.info.pop("changed_users", None)
+    if not changed:
+        return
+    session.flush()
+    ids = sorted(changed)
+    for i in range(0, len(ids), VERSION_BUMP_CHUNK):
+        chunk = ids[i:i + VERSION_BUMP_CHUNK]
+        session.execute(
+            db.update(User)
+            .where(User.id.in_(chunk))
+            .values(data_version=User.data_version + 1)
+        )
+        for model in (Task, TaskTombstone):
+            version = (
+                db.select(User.data_version)
+                .where(User.id == model.user_id)
+                .scalar_subquery()
+            )
+            session.execute(
+                db.update(model)
+                .where(model.user_id.in_(chunk), model.change_seq.is_(None))
+                .values(change_seq=version)
+                .execution_options(synchronize_session=False)
+            )
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_users(session, previous_transaction):
+    session.info.pop("changed_users", None)
+
+
+def data_version(user_id: int) -> int:
+    return db.session.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+
+# ----- Conditional GET -----
+_templates_digest = None
+
+
+def templates_digest() -> str:
+    """
+    Short hash of the template sources and the static asset manifest, so a
+    deploy that changes markup or rebuilds assets invalidates ETags issued
+    by the previous version (whose pages link the old hashed files).
+    """
+    global _templates_digest
+    if _templates_digest is None:
+        h = hashlib.sha1(static_assets.digest.encode())
+        folder = os.path.join(current_app.root_path, current_app.template_folder)
+        for root, _, files in sorted(os.walk(folder)):
+            for name in sorted(files):
+                with open(os.path.join(root, name), "rb") as f:
+                    h.update(name.encode())
+                    h.update(f.read())
+        _templates_digest = h.hexdigest()[:10]
+    return _templates_digest
+
+
+def page_etag(page: str, user_id: int, version: int) -> str:
+    return f"{page}-{user_id}-{version}-{templates_digest()}"
+
+
+def is_fresh(request, etag: str) -> bool:
+    return request.if_none_match.contains_weak(etag)
+
+
+def cached_response(body, etag: str, status: int = 200):
+    response = make_response(body, status)
+    response.set_etag(etag, weak=True)
+    # Per-user content: browsers may keep it but must revalidate each time
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Cookie")
+    return response
+
+
+def not_modified(etag: str):
+    return cached_response("", etag, 304)
+
+
+# ----- Rendered fragment cache -----
+class FragmentCache:
+    """
+    Thread-safe LRU of rendered HTML fragments, bounded by total size in
+    bytes. Keys include the user's data version, so entries never need
+    invalidating; superseded versions simply age out.
+    """
+
+    def __init__(self, max_bytes=FRAGMENT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def put(self, key, html: str):
+        cost = len(html)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = html
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+fragment_cache = FragmentCache()
+
+
+def render_fragment(template: str, user_id: int, version: int, load):
+    """
+    Rendered `template` for this user at this data version. `load` is only
+    called (and the template only rendered) on a cache miss; it returns the
+    template context.
+    """
+    key = (template, user_id, version)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = render_template(template, **load())
+        fragment_cache.put(key, html)
+    return Markup(html)
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+from .config import SESSION_MODES
+from .extensions import db
+from .models import PomodoroSession, upsert_insert
+
+
+def parse_client_datetime(value):
+    """
+    ISO-8601 string from the browser (Date.toISOString) to naive UTC,
+    matching how the rest of the schema stores datetimes.
+    """
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def parse_session(item: dict, user_id: int):
+    """
+    Validated row for one reported interval, or None if it is malformed.
+    """
+    if not isinstance(item, dict):
+        return None
+    client_id = str(item.get("id") or "")[:36]
+    mode = item.get("mode")
+    started_at = parse_client_datetime(item.get("started_at"))
+    ended_at = parse_client_datetime(item.get("ended_at"))
+    try:
+        duration = int(item.get("duration"))
+    except (TypeError, ValueError):
+        return None
+    task_id = item.get("task_id")
+    if not isinstance(task_id, int):
+        task_id = None
+
+    if not client_id or mode not in SESSION_MODES or not started_at or not ended_at:
+        return None
+    if duration < 0 or ended_at < started_at:
+        return None
+
+    return {
+        "user_id": user_id,
+        "task_id": task_id,
+        "client_id": client_id,
+        "mode": mode,
+        "started_at": started_at,
+        "ended_at": ended_at,
+        "duration": duration,
+    }
+
+
+def insert_sessions(rows: list) -> int:
+    """
+    Store a batch of sessions in one multi-row INSERT, skipping client_ids
+    already recorded for the user. Returns the number of new rows.
+    """
+    insert = upsert_insert()
+    if insert is not None:
+        stmt = insert(PomodoroSession).values(rows).on_conflict_do_nothing(
+            index_elements=["user_id", "client_id"]
+        )
+        return db.session.execute(stmt).rowcount
+
+    user_id = rows[0]["user_id"]
+    seen = {
+        cid for (cid,) in db.session.query(PomodoroSession.client_id).filter(
+            PomodoroSession.user_id == user_id,
+            PomodoroSession.client_id.in_([r["client_id"] for r in rows]),
+        )
+    }
+    rows = [r for r in rows if r["client_id"] not in seen]
+    if rows:
+        db.session.execute(db.insert(PomodoroSession), rows)
+    return len(rows)
@@ -0,0 +1,197 @@
+from datetime import datetime, date, timedelta
+from sqlalchemy import func
+
+from .extensions import db
+from .models import Task, TaskArchive, DailyTaskStat, upsert_insert
+
+
+STAT_COLUMNS = ("tasks_created", "tasks_completed", "estimated_pomodoros", "completion_seconds")
+
+
+def upsert_daily_stats(rows: list):
+    """
+    Add each row's deltas to its DailyTaskStat row inside the current
+    transaction, creating rows as needed. Rows are dicts with user_id, day
+    and any STAT_COLUMNS; on SQLite/Postgres this is one executemany
+    INSERT ... ON CONFLICT DO UPDATE.
+    """
+    rows = [
+        {"user_id": r["user_id"], "day": r["day"], **{col: r.get(col, 0) for col in STAT_COLUMNS}}
+        for r in rows
+    ]
+    if not rows:
+        return
+    insert = upsert_insert()
+
+    if insert is not None:
+        stmt = insert(DailyTaskStat)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={col: getattr(DailyTaskStat, col) + stmt.excluded[col] for col in STAT_COLUMNS},
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    for values in rows:
+        row = db.session.get(DailyTaskStat, (values["user_id"], values["day"]))
+        if row is None:
+            db.session.add(DailyTaskStat(**values))
+        else:
+            for col in STAT_COLUMNS:
+                setattr(row, col, getattr(row, col) + values[col])
+
+
+def bump_daily_stat(user_id: int, day: date, **deltas):
+    upsert_daily_stats([{"user_id": user_id, "day": day, **deltas}])
+
+
+class StatDeltas:
+    """
+    Collects rollup changes from several task mutations so they can be
+    written with one upsert per (user, day) instead of one per mutation.
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    def __call__(self, user_id: int, day: date, **deltas):
+        row = self.rows.setdefault((user_id, day), dict.fromkeys(STAT_COLUMNS, 0))
+        for col, value in deltas.items():
+            row[col] += value
+
+    def apply(self):
+        upsert_daily_stats([
+            {"user_id": user_id, "day": day, **values}
+            for (user_id, day), values in self.rows.items()
+        ])
+        self.rows.clear()
+
+
+def record_task_created(task, sign: int = 1, deltas=None):
+    if task.timestamp is None:
+        db.session.flush()
+    (bump_daily_stat if deltas is None else deltas)(
+        task.user_id, task.timestamp.date(),
+        tasks_created=sign,
+        estimated_pomodoros=sign * (task.estimated or 0),
+    )
+
+
+def record_task_completed(task, sign: int = 1, deltas=None):
+    """
+    Call with sign=1 after setting completed_at, and with sign=-1 before
+    clearing it. Pass a StatDeltas as `deltas` to defer the write.
+    """
+    if task.completed_at is None:
+        return
+    latency = 0.0
+    if task.timestamp is not None:
+        latency = (task.completed_at - task.timestamp).total_seconds()
+    (bump_daily_stat if deltas is None else deltas)(
+        task.user_id, task.completed_at.date(),
+        tasks_completed=sign,
+        completion_seconds=sign * latency,
+    )
+
+
+def task_report(user_id: int, days: int) -> dict:
+    """
+    Totals and a per-day breakdown for the last `days` days (today included),
+    read from the rollup table.
+    """
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    rows = (
+        DailyTaskStat.query
+        .filter(DailyTaskStat.user_id == user_id, DailyTaskStat.day >= start)
+        .order_by(DailyTaskStat.day.asc())
+        .all()
+    )
+    by_day = {r.day: r for r in rows}
+
+    daily = []
+    for i in range(days):
+        d = start + timedelta(days=i)
+        r = by_day.get(d)
+        daily.append({
+            "day": d.isoformat(),
+            "created": r.tasks_created if r else 0,
+            "completed": r.tasks_completed if r else 0,
+        })
+
+    created = sum(r.tasks_created for r in rows)
+    completed = sum(r.tasks_completed for r in rows)
+    seconds = sum(r.completion_seconds for r in rows)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "created": created,
+        "completed": completed,
+        "estimated_pomodoros": sum(r.estimated_pomodoros for r in rows),
+        "avg_completion_hours": round(seconds / completed / 3600, 1) if completed else None,
+        "daily": daily,
+    }
+
+
+def _completion_seconds_expr(model=Task):
+    if db.engine.dialect.name == "postgresql":
+        return func.extract("epoch", model.completed_at - model.timestamp)
+    return (func.julianday(model.completed_at) - func.julianday(model.timestamp)) * 86400
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def rebuild_daily_stats(user_id=None) -> int:
+    """
+    Recompute the rollup from the task history (live and archived) with
+    two grouped queries per table, replacing existing rows (all users, or
+    just `user_id`). Returns the number of rows written.
+    """
+    rows = {}
+
+    def row(uid, day):
+        key = (uid, _as_date(day))
+        if key not in rows:
+            rows[key] = {"user_id": key[0], "day": key[1], **{col: 0 for col in STAT_COLUMNS}}
+        return rows[key]
+
+    for model in (Task, TaskArchive):
+        created_q = (
+            db.session.query(
+                model.user_id, func.date(model.timestamp),
+                func.count(model.id), func.coalesce(func.sum(model.estimated), 0),
+            )
+            .filter(model.timestamp.isnot(None))
+            .group_by(model.user_id, func.date(model.timestamp))
+        )
+        completed_q = (
+            db.session.query(
+                model.user_id, func.date(model.completed_at),
+                func.count(model.id), func.coalesce(func.sum(_completion_seconds_expr(model)), 0),
+            )
+            .filter(model.completed.is_(True), model.completed_at.isnot(None))
+            .group_by(model.user_id, func.date(model.completed_at))
+        )
+        if user_id is not None:
+            created_q = created_q.filter(model.user_id == user_id)
+            completed_q = completed_q.filter(model.user_id == user_id)
+
+        for uid, day, count, estimated in created_q:
+            r = row(uid, day)
+            r["tasks_created"] += count
+            r["estimated_pomodoros"] += int(estimated)
+        for uid, day, count, seconds in completed_q:
+            r = row(uid, day)
+            r["tasks_completed"] += count
+            r["completion_seconds"] += float(seconds)
+
+    delete_q = DailyTaskStat.query
+    if user_id is not None:
+        delete_q = delete_q.filter(DailyTaskStat.user_id == user_id)
+    delete_q.delete(synchronize_session=False)
+    if rows:
+        db.session.execute(db.insert(DailyTaskStat), list(rows.values()))
+    db.session.commit()
+    return len(rows)
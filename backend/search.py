@@ -0,0 +1,208 @@
+import re
+import unicodedata
+
+from sqlalchemy import DDL, event, text
+
+from .extensions import db
+from .models import Task, TaskArchive
+
+
+# ----- Full-text index on task.description -----
+# SQLite: a contentless FTS5 table, task_fts, keyed by task id and kept in
+# step by triggers. Each row also indexes an owner token ("u<user_id>") so
+# a search intersects posting lists inside FTS5 rather than filtering every
+# match in the table by user afterwards. Archived tasks keep their ids, so
+# task_archive feeds the same table: archiving drops a row from task_fts
+# with the task and adds it back with the archive copy.
+# Postgres: a generated tsvector column with a GIN index on both tables.
+# Migrations 9c3e5f7a1d24 and b5d9f1e3a7c2 create the same objects on
+# existing databases; the DDL below covers db.create_all().
+
+SQLITE_FTS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        owner, description, content='',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+"""
+
+SQLITE_SEARCH_DDL = (
+    SQLITE_FTS_TABLE,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF user_id, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+)
+
+POSTGRES_SEARCH_DDL = (
+    """
+    ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_task_search_vector ON task USING gin (search_vector)",
+)
+
+SQLITE_ARCHIVE_SEARCH_DDL = (
+    SQLITE_FTS_TABLE,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_archive_fts_insert AFTER INSERT ON task_archive BEGIN
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_archive_fts_delete AFTER DELETE ON task_archive BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+    END
+    """,
+)
+
+POSTGRES_ARCHIVE_SEARCH_DDL = (
+    """
+    ALTER TABLE task_archive ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_task_archive_search_vector ON task_archive"
+    " USING gin (search_vector)",
+)
+
+for table, sqlite_ddl, postgres_ddl in (
+    (Task.__table__, SQLITE_SEARCH_DDL, POSTGRES_SEARCH_DDL),
+    (TaskArchive.__table__, SQLITE_ARCHIVE_SEARCH_DDL, POSTGRES_ARCHIVE_SEARCH_DDL),
+):
+    for statement in sqlite_ddl:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgres_ddl:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Alembic autogenerate filter: the search objects are not in the models."""
+    if type_ == "table" and name.startswith("task_fts"):
+        return False
+    if name in ("search_vector", "ix_task_search_vector", "ix_task_archive_search_vector"):
+        return False
+    return True
+
+
+# ----- Queries -----
+MAX_TERMS = 8
+
+
+def _fold(value: str) -> str:
+    """Lowercase and strip diacritics, as the unicode61 tokenizer does."""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def search_terms(query: str, fold: bool = True) -> list:
+    """
+    Word tokens of a user query, lowercased and, with `fold`, stripped of
+    diacritics; punctuation is dropped.
+    """
+    return re.findall(r"[^\W_]+", _fold(query) if fold else query.lower())[:MAX_TERMS]
+
+
+def _sqlite_matches(user_id: int, terms: list, page: int, per_page: int) -> list:
+    """
+    Ids of one page of the user's tasks with a word starting with every
+    term, plus one to tell whether another page follows. Tasks matching
+    more terms as whole words come first, then newer ones.
+    The owner token keeps each lookup to the user's own postings. Terms of
+    up to three letters are served by the prefix indexes, longer ones by a
+    range scan of the term dictionary. bm25() is not used: it would read
+    each term's postings across all users for its statistics.
+    """
+    owner = f"owner : u{int(user_id)}"
+    params = {
+        "match": owner + "".join(f' AND description : "{t}"*' for t in terms),
+        "limit": per_page + 1,
+        "offset": (page - 1) * per_page,
+    }
+    # Each whole-word lookup is a subquery SQLite runs once, over the same
+    # per-user postings as the prefix match
+    hits = []
+    for i, t in enumerate(terms):
+        params[f"word{i}"] = f'{owner} AND description : "{t}"'
+        hits.append(f"(rowid IN (SELECT rowid FROM task_fts WHERE task_fts MATCH :word{i}))")
+    return db.session.execute(
+        text(
+            "SELECT rowid FROM task_fts WHERE task_fts MATCH :match "
+            f"ORDER BY {' + '.join(hits)} DESC, rowid DESC LIMIT :limit OFFSET :offset"
+        ),
+        params,
+    ).scalars().all()
+
+
+def search_tasks(user_id: int, query: str, page: int = 1, per_page: int = 20):
+    """
+    One page of the user's tasks, live and archived (read-only, with
+    .archived set), matching every term of `query` (each as a word prefix):
+    best match first on Postgres, whole-word matches first on SQLite, newest
+    first elsewhere.
+    Returns (tasks, has_next); the page after the last is simply empty, so
+    no COUNT(*) is needed.
+    """
+    # Only the FTS5 tokenizer strips diacritics; Postgres' 'simple'
+    # tsvector and ILIKE keep them, so terms are folded for SQLite alone
+    dialect = db.engine.dialect.name
+    terms = search_terms(query, fold=dialect == "sqlite")
+    if not terms:
+        return [], False
+    page = max(page, 1)
+
+    if dialect == "sqlite":
+        ids = _sqlite_matches(user_id, terms, page, per_page)
+    elif dialect == "postgresql":
+        tsquery = " & ".join(f"{t}:*" for t in terms)
+        # The user_id and @@ conditions are pushed into both branches, each
+        # served by its table's GIN index
+        ids = db.session.execute(
+            text(
+                "SELECT id FROM ("
+                " SELECT id, user_id, search_vector FROM task"
+                " UNION ALL SELECT id, user_id, search_vector FROM task_archive"
+                ") AS t, to_tsquery('simple', :q) AS query "
+                "WHERE user_id = :user_id AND search_vector @@ query "
+                "ORDER BY ts_rank(search_vector, query) DESC, id DESC "
+                "LIMIT :limit OFFSET :offset"
+            ),
+            {"q": tsquery, "user_id": user_id, "limit": per_page + 1,
+             "offset": (page - 1) * per_page},
+        ).scalars().all()
+    else:
+        # No full-text index on this backend: fall back to a scan
+        matches = db.union_all(*(
+            db.select(model.id.label("id"), model.timestamp.label("timestamp")).where(
+                model.user_id == user_id, *(model.description.ilike(f"%{t}%") for t in terms)
+            )
+            for model in (Task, TaskArchive)
+        )).subquery()
+        ids = db.session.execute(
+            db.select(matches.c.id)
+            .order_by(matches.c.timestamp.desc(), matches.c.id.desc())
+            .offset((page - 1) * per_page).limit(per_page + 1)
+        ).scalars().all()
+
+    has_next = len(ids) > per_page
+    ids = ids[:per_page]
+    if not ids:
+        return [], has_next
+    by_id = {t.id: t for model in (Task, TaskArchive) for t in model.query.filter(model.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id], has_next
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text
+
+from .config import TASK_CHANGES_PAGE_SIZE, TOMBSTONE_RETENTION_DAYS
+from .extensions import db
+from .models import Task, TaskTombstone, User
+
+
+# ----- Delta sync -----
+# Every task and tombstone carries the change_seq its last commit was
+# stamped with (see page_cache). A cursor is the (change_seq, id) of the
+# last row a client has seen, so /api/tasks/changes reads only the rows
+# after it, in index order, however long the user's history is. A task
+# changed again moves past the cursor and is simply sent again.
+#
+# Cursors come in two forms. "<seq>" is handed out at the end of the feed
+# and means everything up to and including that version. "<seq>.<id>.<floor>"
+# is handed out mid-feed and records the user's sync_floor at the time, so
+# paging that began before tombstones were pruned or tasks archived can
+# be told to start over.
+
+CURSOR_END = 2 ** 62     # id part of a "<seq>" cursor: past every row of seq
+
+
+def encode_change_cursor(seq: int, row_id=None, floor=None) -> str:
+    return f"{seq}" if row_id is None else f"{seq}.{row_id}.{floor}"
+
+
+def decode_change_cursor(cursor):
+    """
+    (change_seq, id, floor) for a cursor from encode_change_cursor, with
+    floor None for an end-of-feed cursor; None when it is malformed.
+    """
+    try:
+        parts = [int(p) for p in cursor.split(".")]
+    except (AttributeError, ValueError):
+        return None
+    if len(parts) == 1:
+        return parts[0], CURSOR_END, None
+    if len(parts) == 3:
+        return tuple(parts)
+    return None
+
+
+# Each side is an index range scan entered right at the cursor (the row
+# value comparison reaches into the primary key the index ends with) and
+# capped at :limit + 1 rows; the union only merges those.
+CHANGES_SQL = text(
+    "SELECT seq, id, deleted FROM ("
+    " SELECT * FROM (SELECT change_seq AS seq, id, 0 AS deleted FROM task"
+    "  WHERE user_id = :user_id AND (change_seq, id) > (:seq, :id)"
+    "  ORDER BY change_seq, id LIMIT :limit + 1) AS live"
+    " UNION ALL"
+    " SELECT * FROM (SELECT change_seq, task_id, 1 FROM task_tombstone"
+    "  WHERE user_id = :user_id AND (change_seq, task_id) > (:seq, :id)"
+    "  ORDER BY change_seq, task_id LIMIT :limit + 1) AS gone"
+    ") AS changes ORDER BY seq, id LIMIT :limit + 1"
+)
+
+
+def task_changes(user_id: int, cursor, limit: int = TASK_CHANGES_PAGE_SIZE,
+                 snapshot: bool = True) -> dict:
+    """
+    Tasks changed and task ids deleted after `cursor`, oldest change first,
+    at most `limit` rows. The result's "cursor" resumes after the last row;
+    "more" says whether another page is waiting. "reset" tells the client
+    to drop what it has first: the page starts from the beginning because
+    there was no cursor, or it was malformed, or it predates the user's
+    sync_floor (tombstones were pruned or tasks archived since). With
+    snapshot=False a reset carries no rows, only the cursor to resume from
+    once the client has reloaded its lists by other means.
+    """
+    version, floor = db.session.query(User.data_version, User.sync_floor).filter(
+        User.id == user_id
+    ).one()
+    position = decode_change_cursor(cursor) if cursor else None
+    if position is None:
+        reset = True
+    elif position[2] is None:
+        reset = position[0] < floor
+    else:
+        reset = position[2] != floor
+    if reset and not snapshot:
+        return {"tasks": [], "deleted": [], "cursor": encode_change_cursor(version),
+                "more": False, "reset": True}
+    seq, row_id = (0, 0) if reset else position[:2]
+
+    rows = db.session.execute(CHANGES_SQL, {
+        "user_id": user_id, "seq": seq, "id": row_id, "limit": limit,
+    }).all()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    task_ids = [r.id for r in rows if not r.deleted]
+    tasks = Task.query.filter(Task.id.in_(task_ids)).all() if task_ids else []
+    by_id = {t.id: t for t in tasks}
+    if more:
+        cursor = encode_change_cursor(rows[-1].seq, rows[-1].id, floor)
+    else:
+        # Every commit up to the version read above has been seen (its rows
+        # were visible to the query that followed)
+        cursor = encode_change_cursor(max(version, rows[-1].seq if rows else seq))
+    return {
+        "tasks": [by_id[i] for i in task_ids if i in by_id],
+        "deleted": [r.id for r in rows if r.deleted],
+        "cursor": cursor,
+        "more": more,
+        "reset": reset,
+    }
+
+
+def prune_tombstones(days: int = TOMBSTONE_RETENTION_DAYS) -> int:
+    """
+    Delete tombstones older than `days`, raising each affected user's
+    sync_floor so cursors from before the pruned deletions get a reset.
+    Returns the number of tombstones removed.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    old = TaskTombstone.deleted_at < cutoff
+    pruned_upto = (
+        db.select(func.max(TaskTombstone.change_seq))
+        .where(TaskTombstone.user_id == User.id, old)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        db.update(User)
+        .where(User.id.in_(db.select(TaskTombstone.user_id).where(old)))
+        .values(sync_floor=func.max(User.sync_floor, pruned_upto)
+                if db.engine.dialect.name == "sqlite"
+                else func.greatest(User.sync_floor, pruned_upto))
+        .execution_options(synchronize_session=False)
+    )
+    removed = db.session.execute(
+        db.delete(TaskTombstone).where(old).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return removed
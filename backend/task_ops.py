@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from .events import queue_task_event, queue_task_deleted, queue_tasks_assigned
+from .extensions import db
+from .models import Task, TaskTombstone
+from .page_cache import mark_user_changed, mark_users_changed
+from .reporting import record_task_created, record_task_completed, upsert_daily_stats
+
+
+# Task mutations shared by the single-task endpoints, /api/tasks/batch and
+# admin assignment. Each keeps the report rollup and the owner's data
+# version in step, leaves change_seq NULL for the commit to stamp, queues a
+# change-feed event, and leaves the commit to the caller; pass a StatDeltas
+# as `deltas` to batch rollup writes.
+
+def parse_estimated(value) -> int:
+    try:
+        return int(value) or 1
+    except (TypeError, ValueError):
+        return 1
+
+
+def create(user_id: int, description: str, estimated: int = 1,
+           assigned_by_admin: bool = False, deltas=None, client_id=None) -> Task:
+    task = Task(
+        description=description,
+        estimated=estimated,
+        user_id=user_id,
+        assigned_by_admin=assigned_by_admin,
+        timestamp=datetime.utcnow(),
+        client_id=client_id,
+    )
+    db.session.add(task)
+    record_task_created(task, deltas=deltas)
+    mark_user_changed(user_id)
+    queue_task_event("created", task)
+    return task
+
+
+def toggle(task, deltas=None):
+    if task.completed:
+        record_task_completed(task, -1, deltas)
+    task.completed = not task.completed
+    task.completed_at = datetime.utcnow() if task.completed else None
+    if task.completed:
+        record_task_completed(task, deltas=deltas)
+    task.change_seq = None
+    mark_user_changed(task.user_id)
+    queue_task_event("updated", task)
+
+
+def delete(task, deltas=None):
+    record_task_created(task, -1, deltas)
+    if task.completed:
+        record_task_completed(task, -1, deltas)
+    mark_user_changed(task.user_id)
+    queue_task_deleted(task)
+    db.session.add(TaskTombstone(
+        task_id=task.id, user_id=task.user_id, change_seq=None, deleted_at=datetime.utcnow(),
+    ))
+    db.session.delete(task)
+
+
+def bulk_create(user_ids, description: str, estimated: int = 1,
+                assigned_by_admin: bool = True) -> int:
+    """
+    Create the same task for many users with one executemany INSERT, plus
+    one executemany rollup upsert. Returns the number of tasks created.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+
+    now = datetime.utcnow()
+    db.session.execute(db.insert(Task), [
+        {
+            "user_id": uid,
+            "description": description,
+            "estimated": estimated,
+            "completed": False,
+            "timestamp": now,
+            "assigned_by_admin": assigned_by_admin,
+        }
+        for uid in user_ids
+    ])
+    upsert_daily_stats([
+        {"user_id": uid, "day": now.date(), "tasks_created": 1, "estimated_pomodoros": estimated}
+        for uid in user_ids
+    ])
+    mark_users_changed(user_ids)
+    queue_tasks_assigned(user_ids, description, estimated)
+    return len(user_ids)
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+from .config import USER_CACHE_SIZE, USER_CACHE_TTL, USER_CACHE_REDIS_URL
+
+
+USER_CACHE_CHANNEL = "pomoweb:user-cache:invalidate"
+
+
+class CachedUser(UserMixin):
+    """
+    The subset of User that current_user needs on every request. Read-only;
+    load the ORM User when anything else is required.
+    """
+    __slots__ = ("id", "username", "is_admin")
+
+    def __init__(self, id, username, is_admin):
+        self.id = id
+        self.username = username
+        self.is_admin = bool(is_admin)
+
+
+class UserCache:
+    """
+    Thread-safe in-process LRU of CachedUser entries with a TTL.
+
+    Call invalidate(user_id) after committing any change to a user's
+    username or admin flag, a password reset, or a deletion. With
+    USER_CACHE_REDIS_URL set, invalidations are also published over Redis
+    pub/sub so every gunicorn worker evicts the entry, not just this one.
+    """
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener_pid = None
+
+    def init_app(self, app):
+        self.maxsize = app.config.get("USER_CACHE_SIZE", self.maxsize)
+        self.ttl = app.config.get("USER_CACHE_TTL", self.ttl)
+        url = app.config.get("USER_CACHE_REDIS_URL", USER_CACHE_REDIS_URL)
+        if url:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError(
+                    "USER_CACHE_REDIS_URL is set but the 'redis' package is not installed"
+                )
+            self._redis = redis.Redis.from_url(url)
+
+    def get(self, user_id: int):
+        self._ensure_listener()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < now:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user_id: int, username: str, is_admin: bool) -> CachedUser:
+        user = CachedUser(user_id, username, is_admin)
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id: int):
+        self._evict(user_id)
+        if self._redis is not None:
+            self._redis.publish(USER_CACHE_CHANNEL, str(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def _ensure_listener(self):
+        # Started lazily and per process, so it runs in each forked worker
+        # rather than only in a preloading gunicorn master.
+        if self._redis is None or self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._entries.clear()
+        threading.Thread(target=self._listen, name="user-cache-invalidation", daemon=True).start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(USER_CACHE_CHANNEL)
+                for message in pubsub.listen():
+                    try:
+                        self._evict(int(message["data"]))
+                    except (TypeError, ValueError):
+                        continue
+            except Exception:
+                # Lost the connection: anything published meanwhile was
+                # missed, so drop everything rather than serve stale entries.
+                self.clear()
+                time.sleep(1)
+
+
+user_cache = UserCache()
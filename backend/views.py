@@ -0,0 +1,816 @@
+import math
+from datetime import datetime
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, jsonify
+from markupsafe import Markup
+from flask_login import login_user, login_required, logout_user, current_user
+from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import joinedload, load_only
+
+from .auth import AuthBusy, RateLimited, find_login_user, hash_pool, rate_limiter
+from .config import (
+    ADMIN_TASKS_PER_PAGE, ADMIN_USER_TASKS_LIMIT, SESSION_BATCH_MAX,
+    TASK_BATCH_MAX, TASK_CHANGES_PAGE_SIZE, TASKS_PAGE_SIZE, TASKS_PAGE_SIZE_MAX,
+)
+from .db_routing import read_engine_route
+from .events import ADMIN_CHANNEL, event_stream, user_channel
+from .export import export_query, parse_date_arg, stream_export
+from .extensions import db
+from .models import User, Task, TaskArchive, TaskTombstone, OutboxMessage
+from .page_cache import (
+    data_version, page_etag, is_fresh, not_modified, cached_response, render_fragment,
+)
+from .pomodoro import parse_session, insert_sessions
+from .reporting import StatDeltas, task_report
+from .search import search_tasks
+from .sync import encode_change_cursor, task_changes
+from . import task_ops
+from .user_cache import user_cache
+
+
+main = Blueprint("main", __name__)
+
+
+
+
+def get_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"])
+
+
+def encode_task_cursor(task) -> str:
+    return f"{task.timestamp.isoformat()}_{task.id}"
+
+
+def decode_task_cursor(cursor: str):
+    """
+    Returns (timestamp, id) for a cursor produced by encode_task_cursor,
+    or None if it is malformed.
+    """
+    try:
+        ts, task_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(ts), int(task_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def task_page(user_id: int, completed=None, cursor=None, limit=TASKS_PAGE_SIZE):
+    """
+    One page of a user's tasks, newest first, using keyset pagination on
+    (timestamp, id) so the cost of a page does not depend on how deep it is.
+    Listings that include completed tasks also read task_archive, merging
+    the two newest-first streams. Returns (tasks, next_cursor); next_cursor
+    is None on the last page.
+    """
+    models = (Task,) if completed is False else (Task, TaskArchive)
+    rows = []
+    for model in models:
+        query = model.query.filter(model.user_id == user_id)
+        if completed is not None and model is Task:
+            query = query.filter(Task.completed.is_(completed))
+        if cursor:
+            ts, task_id = cursor
+            query = query.filter(or_(
+                model.timestamp < ts,
+                and_(model.timestamp == ts, model.id < task_id),
+            ))
+        rows += query.order_by(model.timestamp.desc(), model.id.desc()).limit(limit + 1).all()
+
+    if len(models) > 1:
+        rows.sort(key=lambda t: (t.timestamp, t.id), reverse=True)
+        rows = rows[:limit + 1]
+    next_cursor = encode_task_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def task_to_dict(task) -> dict:
+    return {
+        "id": task.id,
+        "description": task.description,
+        "estimated": task.estimated,
+        "completed": bool(task.completed),
+        "assigned_by_admin": task.assigned_by_admin,
+        "archived": task.archived,
+    }
+
+
+
+
+# Routes
+@main.route("/")
+def index():
+    return render_template("base.html", landing_page=True)
+
+@main.route("/home")
+@login_required
+def home():
+    uid = current_user.id
+    version = data_version(uid)
+    etag = page_etag("home", uid, version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+
+    def load_pending():
+        tasks_list, next_cursor = task_page(uid, completed=False)
+        return {"pending_tasks": tasks_list, "pending_next": next_cursor}
+
+    def load_completed():
+        tasks_list, next_cursor = task_page(uid, completed=True)
+        return {"completed_tasks": tasks_list, "completed_next": next_cursor}
+
+    return cached_response(render_template(
+        "home.html",
+        sync_cursor=encode_change_cursor(version),
+        pending_html=render_fragment("_home_pending.html", uid, version, load_pending),
+        completed_html=render_fragment("_home_completed.html", uid, version, load_completed),
+    ), etag)
+
+@main.route("/tasks", methods=["GET", "POST"])
+@login_required
+def tasks():
+    """
+    Separate Tasks page (optional) that can also create a task.
+    """
+    if request.method == "POST":
+        desc = request.form.get("description", "").strip()
+        est = request.form.get("estimated", type=int) or 1
+        if desc:
+            task_ops.create(current_user.id, desc, est)
+            db.session.commit()
+        return redirect(url_for("main.tasks"))
+
+    uid = current_user.id
+    query = request.args.get("q", "").strip()
+    if query:
+        found, has_next = search_tasks(uid, query, per_page=TASKS_PAGE_SIZE)
+        return render_template(
+            "tasks.html",
+            query=query,
+            task_list_html=Markup(render_template(
+                "_task_list.html", tasks=found, next_page=2 if has_next else None, query=query,
+            )),
+        )
+
+    version = data_version(uid)
+    etag = page_etag("tasks", uid, version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+
+    def load_tasks():
+        tasks_list, next_cursor = task_page(uid)
+        return {"tasks": tasks_list, "next_cursor": next_cursor}
+
+    return cached_response(render_template(
+        "tasks.html",
+        task_list_html=render_fragment("_task_list.html", uid, version, load_tasks),
+    ), etag)
+
+
+@main.route("/api/tasks")
+@login_required
+def api_tasks():
+    """
+    Keyset-paginated task listing for the current user.
+    Query params: 'completed' (1/0, optional), 'cursor' (from a previous
+    response's 'next'), 'limit'.
+    """
+    completed = request.args.get("completed")
+    if completed is not None:
+        completed = completed.lower() in ("1", "true", "yes")
+
+    cursor = None
+    raw_cursor = request.args.get("cursor")
+    if raw_cursor:
+        cursor = decode_task_cursor(raw_cursor)
+        if cursor is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    limit = request.args.get("limit", TASKS_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, TASKS_PAGE_SIZE_MAX))
+
+    tasks_list, next_cursor = task_page(current_user.id, completed, cursor, limit)
+    return jsonify({
+        "tasks": [task_to_dict(t) for t in tasks_list],
+        "next": next_cursor
+    })
+
+
+@main.route("/api/tasks/changes")
+@login_required
+def api_task_changes():
+    """
+    Delta sync for the browser's task cache. Query params: 'since' (the
+    'cursor' of a previous response; omit for a full snapshot), 'limit',
+    'snapshot' (0 to get only a fresh cursor instead of every task when
+    the feed resets). Returns {"tasks": [...], "deleted": [ids], "cursor",
+    "more", "reset"}; keep calling with the new cursor while 'more' is true.
+    """
+    limit = request.args.get("limit", TASK_CHANGES_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, TASK_CHANGES_PAGE_SIZE))
+    snapshot = request.args.get("snapshot", "1").lower() not in ("0", "false", "no")
+
+    changes = task_changes(current_user.id, request.args.get("since"), limit, snapshot)
+    changes["tasks"] = [
+        {**task_to_dict(t), "timestamp": t.timestamp.isoformat() if t.timestamp else None}
+        for t in changes["tasks"]
+    ]
+    return jsonify(changes)
+
+
+
+@main.route("/api/tasks/search")
+@login_required
+def api_search_tasks():
+    """
+    Full-text search over the current user's tasks. Query params: 'q'
+    (every word must match, as a prefix), 'page', 'limit'. Results are
+    ranked best first; 'next' is the following page number or null.
+    """
+    query = request.args.get("q", "")
+    page = max(request.args.get("page", 1, type=int), 1)
+    limit = max(1, min(request.args.get("limit", TASKS_PAGE_SIZE, type=int), TASKS_PAGE_SIZE_MAX))
+    found, has_next = search_tasks(current_user.id, query, page, limit)
+    return jsonify({
+        "tasks": [task_to_dict(t) for t in found],
+        "next": page + 1 if has_next else None,
+    })
+
+
+@main.route("/events")
+@login_required
+def events():
+    """Live changes to the current user's tasks, as Server-Sent Events."""
+    return event_stream(user_channel(current_user.id))
+
+
+@main.route("/api/sessions", methods=["POST"])
+@login_required
+def api_sessions():
+    """
+    Batched ingestion of finished timer intervals from timer.js.
+    Accepts JSON: {"sessions": [{"id", "mode", "started_at", "ended_at",
+    "duration", "task_id"}, ...]}. Safe to retry: intervals are keyed by
+    their client-generated id.
+    """
+    payload = request.get_json(force=True, silent=True) or {}
+    items = payload.get("sessions")
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a 'sessions' list"}), 400
+    if len(items) > SESSION_BATCH_MAX:
+        return jsonify({"error": f"At most {SESSION_BATCH_MAX} sessions per batch"}), 400
+
+    rows = {}
+    for item in items:
+        row = parse_session(item, current_user.id)
+        if row:
+            rows[row["client_id"]] = row
+    rows = list(rows.values())
+
+    # Drop task references that are not the current user's own tasks; a
+    # task may have been archived before its last interval got here
+    task_ids = {r["task_id"] for r in rows if r["task_id"] is not None}
+    if task_ids:
+        owned = {
+            tid for model in (Task, TaskArchive) for (tid,) in db.session.query(model.id).filter(
+                model.user_id == current_user.id, model.id.in_(task_ids)
+            )
+        }
+        for r in rows:
+            if r["task_id"] not in owned:
+                r["task_id"] = None
+
+    accepted = insert_sessions(rows) if rows else 0
+    db.session.commit()
+    return jsonify({"received": len(items), "accepted": accepted})
+
+
+
+
+
+# ----- Auth -----
+def auth_refused(template: str, error, **context):
+    """
+    Response for an attempt turned away before any password hashing: 429
+    with the limiter's Retry-After, or 503 when the hash pool is full.
+    """
+    if isinstance(error, RateLimited):
+        status, retry_after = 429, math.ceil(error.retry_after)
+        message = "Too many attempts. Please wait a moment and try again."
+    else:
+        status, retry_after = 503, 1
+        message = "Sign-in is busy right now. Please try again."
+    response = current_app.make_response(
+        (render_template(template, error=message, **context), status)
+    )
+    response.headers["Retry-After"] = str(max(retry_after, 1))
+    return response
+
+
+@main.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        username = (request.form.get("username") or "").strip()
+        email = (request.form.get("email") or "").strip().lower()
+        password = (request.form.get("password") or "").strip()
+
+        if not username or not email or not password:
+            return render_template("register.html", error="All fields are required")
+        try:
+            rate_limiter.check_attempt(request.remote_addr)
+        except RateLimited as e:
+            return auth_refused("register.html", e)
+
+        if User.query.filter_by(username=username).first():
+            return render_template("register.html", error="Username already exists")
+        if User.query.filter(func.lower(User.email) == email).first():
+            return render_template("register.html", error="Email already in use")
+
+        try:
+            hashed = hash_pool.hash(password)
+        except AuthBusy as e:
+            return auth_refused("register.html", e)
+        user = User(username=username, email=email, password=hashed)
+        db.session.add(user)
+        db.session.commit()
+        return redirect(url_for("main.login"))
+    return render_template("register.html")
+
+
+
+@main.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        identifier = (request.form.get("identifier") or "").strip()
+        password = (request.form.get("password") or "").strip()
+
+        # Floods are turned away before the lookup and the hash
+        try:
+            rate_limiter.check_attempt(request.remote_addr, identifier)
+            user = find_login_user(identifier)
+            valid = user is not None and hash_pool.check(user, password)
+        except (RateLimited, AuthBusy) as e:
+            return auth_refused("login.html", e)
+        if not valid:
+            return render_template("login.html", error="Invalid credentials")
+        if db.session.dirty:
+            db.session.commit()     # hash upgraded to the current parameters
+
+        login_user(user)
+        return redirect(url_for("main.admin" if user.is_admin else "main.home"))
+
+    return render_template("login.html")
+
+
+@main.route("/logout")
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for("main.login"))
+
+
+
+
+
+# ----- Admin -----
+@main.route("/admin", methods=["GET", "POST"])
+@login_required
+@read_engine_route
+def admin():
+    if not current_user.is_admin:
+        return redirect(url_for("main.home"))
+
+    if request.method == "POST":
+        created = assign_tasks()
+        if request.is_json:
+            if created is None:
+                return jsonify({"error": "Task description and a list of at least one user are required"}), 400
+            return jsonify({"created": created})
+        return redirect(url_for("main.admin", assigned=created or 0))
+
+    users = (
+        User.query
+        .options(load_only(User.id, User.username, User.is_admin))
+        .order_by(User.username.asc())
+        .all()
+    )
+
+    # "All Assigned Tasks" is filtered and paginated server-side; the owning
+    # user is joined in the same SELECT so the template never lazy-loads it.
+    filter_user_id = request.args.get("user_id", type=int)
+    status = request.args.get("status", "")
+    page = request.args.get("page", 1, type=int)
+
+    query = Task.query.options(joinedload(Task.user).load_only(User.id, User.username))
+    if filter_user_id:
+        query = query.filter(Task.user_id == filter_user_id)
+    if status == "completed":
+        query = query.filter(Task.completed.is_(True))
+    elif status == "pending":
+        query = query.filter(Task.completed.is_(False))
+
+    tasks = db.paginate(
+        query.order_by(Task.timestamp.desc(), Task.id.desc()),
+        page=page,
+        per_page=ADMIN_TASKS_PER_PAGE,
+        error_out=False,
+    )
+
+    return render_template(
+        "admin.html",
+        users=users,
+        tasks=tasks,
+        filter_user_id=filter_user_id,
+        status=status,
+        assigned=request.args.get("assigned", type=int),
+    )
+
+
+def assign_tasks():
+    """
+    Handle an admin assignment (form or JSON). Targets are the listed
+    'user_ids' (or legacy single 'user_id'), or, with 'all_users' set, every
+    non-admin user whose username contains 'username_filter'. All tasks are
+    created in one transaction; returns how many, or None if the request was
+    incomplete or malformed.
+    """
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return None
+        user_ids = data.get("user_ids") or []
+        if not isinstance(user_ids, list):
+            return None
+        raw_ids = list(user_ids)
+        if data.get("user_id") is not None:
+            raw_ids.append(data.get("user_id"))
+        all_users = bool(data.get("all_users"))
+        username_filter = (data.get("username_filter") or "").strip()
+        description = (data.get("task_description") or "").strip()
+        estimated = task_ops.parse_estimated(data.get("estimated", 1))
+    else:
+        raw_ids = request.form.getlist("user_ids") + request.form.getlist("user_id")
+        all_users = request.form.get("all_users") == "1"
+        username_filter = (request.form.get("username_filter") or "").strip()
+        description = (request.form.get("task_description") or "").strip()
+        estimated = request.form.get("estimated", type=int) or 1
+
+    if not description:
+        return None
+
+    if all_users:
+        query = db.session.query(User.id).filter(User.is_admin.isnot(True))
+        if username_filter:
+            query = query.filter(
+                func.lower(User.username).contains(username_filter.lower(), autoescape=True)
+            )
+    else:
+        ids = set()
+        for raw in raw_ids:
+            try:
+                ids.add(int(raw))
+            except (TypeError, ValueError):
+                continue
+        if not ids:
+            return None
+        query = db.session.query(User.id).filter(User.id.in_(ids))
+
+    created = task_ops.bulk_create([uid for (uid,) in query], description, estimated)
+    db.session.commit()
+    return created
+
+
+@main.route("/admin/events")
+@login_required
+def admin_events():
+    """Live changes to every user's tasks, for open admin dashboards."""
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+    return event_stream(ADMIN_CHANNEL)
+
+
+@main.route("/admin/users/<int:user_id>/tasks")
+@login_required
+@read_engine_route
+def admin_user_tasks(user_id: int):
+    """
+    JSON list of one user's tasks, fetched by the admin modal when it opens.
+    """
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    rows = (
+        db.session.query(Task.id, Task.description, Task.completed, Task.timestamp)
+        .filter(Task.user_id == user_id)
+        .order_by(Task.timestamp.desc(), Task.id.desc())
+        .limit(ADMIN_USER_TASKS_LIMIT)
+        .all()
+    )
+    return jsonify([
+        {
+            "id": r.id,
+            "description": r.description,
+            "completed": bool(r.completed),
+            "timestamp": r.timestamp.strftime('%Y-%m-%d %H:%M') if r.timestamp else None
+        }
+        for r in rows
+    ])
+
+
+@main.route("/report")
+@login_required
+@read_engine_route
+def report():
+    return render_template(
+        "report.html",
+        week=task_report(current_user.id, 7),
+        month=task_report(current_user.id, 30),
+    )
+
+
+@main.route("/api/report")
+@login_required
+@read_engine_route
+def api_report():
+    days = 30 if request.args.get("period") == "month" else 7
+    return jsonify(task_report(current_user.id, days))
+
+
+# ----- Export -----
+def export_filters():
+    """
+    (since, until, gzip) from the query string: 'from' and 'to' as
+    YYYY-MM-DD (both inclusive) and 'gzip=1'. Raises ValueError on bad dates.
+    """
+    since = parse_date_arg(request.args.get("from"))
+    until = parse_date_arg(request.args.get("to"))
+    compress = request.args.get("gzip", "").lower() in ("1", "true", "yes")
+    return since, until, compress
+
+
+@main.route("/export/tasks.<any(csv, ndjson):fmt>")
+@login_required
+@read_engine_route
+def export_tasks(fmt: str):
+    """The current user's task history as streamed CSV or NDJSON."""
+    try:
+        since, until, compress = export_filters()
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+    stmt = export_query(user_id=current_user.id, since=since, until=until)
+    return stream_export(fmt, stmt, f"tasks-{datetime.utcnow():%Y%m%d}", compress)
+
+
+@main.route("/admin/export/tasks.<any(csv, ndjson):fmt>")
+@login_required
+@read_engine_route
+def admin_export_tasks(fmt: str):
+    """Every user's tasks (or one user's, with 'user_id'), with usernames."""
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+    try:
+        since, until, compress = export_filters()
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+    stmt = export_query(
+        user_id=request.args.get("user_id", type=int),
+        since=since, until=until, with_username=True,
+    )
+    return stream_export(fmt, stmt, f"all-tasks-{datetime.utcnow():%Y%m%d}", compress)
+
+
+
+
+
+# ----- Task actions used from Home/Tasks -----
+@main.route("/add_task", methods=["POST"])
+@login_required
+def add_task():
+    """
+    Endpoint used by the Home modal to add a task.
+    Accepts JSON: 'description' and optional 'estimated'.
+    """
+    desc = ""
+    est = 1
+    if request.is_json:
+        payload = request.get_json(silent=True) or {}
+        desc = (payload.get("description") or "").strip()
+        est = task_ops.parse_estimated(payload.get("estimated", 1))
+    else:
+        desc = (request.form.get("description") or "").strip()
+        est = request.form.get("estimated", type=int) or 1
+
+    if not desc:
+        return jsonify({"error": "Task description is required"}), 400
+
+    task = task_ops.create(current_user.id, desc, est)
+    db.session.flush()
+    result = task_to_dict(task)
+    db.session.commit()
+
+    return jsonify(result)
+
+
+@main.route("/toggle_task/<int:task_id>", methods=["POST"])
+@login_required
+def toggle_task(task_id: int):
+    task = Task.query.get_or_404(task_id)
+    if task.user_id != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    task_ops.toggle(task)
+    completed = task.completed
+
+    db.session.commit()
+    is_ajax = request.is_json or request.headers.get("X-Requested-With") == "XMLHttpRequest"
+    if is_ajax:
+        return jsonify({"success": True, "completed": completed, "id": task_id})
+    return redirect(request.headers.get("Referer") or url_for("main.tasks"))
+
+
+@main.route("/delete_task/<int:task_id>", methods=["POST"])
+@login_required
+def delete_task(task_id: int):
+    task = Task.query.get_or_404(task_id)
+    if task.user_id != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    task_ops.delete(task)
+    db.session.commit()
+
+    is_ajax = request.is_json or request.headers.get("X-Requested-With") == "XMLHttpRequest"
+    if is_ajax:
+        return jsonify({"success": True, "id": task_id})
+    return redirect(request.headers.get("Referer") or url_for("main.tasks"))
+
+
+
+@main.route("/api/tasks/batch", methods=["POST"])
+@login_required
+def api_tasks_batch():
+    """
+    Apply several task actions in one transaction.
+    Accepts JSON: {"ops": [{"op": "add", "description", "estimated"},
+    {"op": "toggle", "id"}, {"op": "delete", "id"}, ...]}. Returns one
+    result per op, in order, shaped like the matching single-task endpoint's
+    response; failed ops carry "success": false, "error" and "status".
+
+    Ops replayed by an offline client are safe to apply twice: an add with
+    a "client_id" already stored returns the existing task, a toggle with
+    "completed" sets that state rather than flipping it, and deleting a
+    task that is already gone succeeds.
+    """
+    payload = request.get_json(silent=True) or {}
+    ops = payload.get("ops")
+    if not isinstance(ops, list):
+        return jsonify({"error": "Expected an 'ops' list"}), 400
+    if len(ops) > TASK_BATCH_MAX:
+        return jsonify({"error": f"At most {TASK_BATCH_MAX} operations per batch"}), 400
+
+    # One ownership lookup for every task the batch touches
+    ids = {
+        op.get("id") for op in ops
+        if isinstance(op, dict) and isinstance(op.get("id"), int)
+    }
+    tasks_by_id = {t.id: t for t in Task.query.filter(Task.id.in_(ids))} if ids else {}
+    deleted_ids = {
+        task_id for (task_id,) in db.session.query(TaskTombstone.task_id).filter(
+            TaskTombstone.user_id == current_user.id,
+            TaskTombstone.task_id.in_(ids - tasks_by_id.keys()),
+        )
+    } if ids - tasks_by_id.keys() else set()
+    client_ids = {
+        op.get("client_id")[:36] for op in ops
+        if isinstance(op, dict) and op.get("op") == "add" and isinstance(op.get("client_id"), str)
+    }
+    tasks_by_client_id = {
+        t.client_id: t for t in Task.query.filter(
+            Task.user_id == current_user.id, Task.client_id.in_(client_ids)
+        )
+    } if client_ids else {}
+
+    def failed(error, status):
+        return {"success": False, "error": error, "status": status}
+
+    deltas = StatDeltas()
+    applied = []
+    with db.session.no_autoflush:
+        for op in ops:
+            kind = op.get("op") if isinstance(op, dict) else None
+            if kind == "add":
+                desc = op.get("description")
+                desc = desc.strip() if isinstance(desc, str) else ""
+                if not desc:
+                    applied.append(failed("Task description is required", 400))
+                    continue
+                client_id = op.get("client_id")
+                client_id = client_id[:36] if isinstance(client_id, str) and client_id else None
+                task = tasks_by_client_id.get(client_id)
+                if task is None:
+                    est = task_ops.parse_estimated(op.get("estimated", 1))
+                    task = task_ops.create(current_user.id, desc, est, deltas=deltas, client_id=client_id)
+                    if client_id:
+                        tasks_by_client_id[client_id] = task
+                applied.append(("add", task))
+            elif kind in ("toggle", "delete"):
+                task = tasks_by_id.get(op.get("id"))
+                if task is None and kind == "delete" and op.get("id") in deleted_ids:
+                    applied.append({"success": True, "id": op.get("id")})
+                elif task is None:
+                    applied.append(failed("Not found", 404))
+                elif task.user_id != current_user.id:
+                    applied.append(failed("Unauthorized", 403))
+                elif kind == "toggle":
+                    wanted = op.get("completed")
+                    if not isinstance(wanted, bool) or wanted != bool(task.completed):
+                        task_ops.toggle(task, deltas)
+                    applied.append(("toggle", task))
+                else:
+                    task_ops.delete(task, deltas)
+                    del tasks_by_id[task.id]
+                    deleted_ids.add(task.id)
+                    applied.append(("delete", task))
+            else:
+                applied.append(failed("Unknown op", 400))
+
+    deltas.apply()
+    db.session.flush()
+
+    results = []
+    for item in applied:
+        if isinstance(item, dict):
+            results.append(item)
+            continue
+        kind, task = item
+        if kind == "add":
+            results.append({"success": True, **task_to_dict(task)})
+        elif kind == "toggle":
+            results.append({"success": True, "completed": task.completed, "id": task.id})
+        else:
+            results.append({"success": True, "id": task.id})
+
+    db.session.commit()
+    return jsonify({"results": results})
+
+
+
+@main.route("/user/<usr>")
+@login_required
+def user_profile(usr: str):
+    return render_template("user.html", name=usr)
+
+
+
+@main.route("/forgot", methods=["GET", "POST"])
+def forgot_password():
+    if request.method == "POST":
+        identifier = (request.form.get("identifier") or "").strip()
+
+        user = find_login_user(identifier)
+        if user and user.email:
+            s = get_serializer()
+            token = s.dumps({"uid": user.id, "email": user.email})
+            reset_link = url_for("main.reset_password", token=token, _external=True)
+
+            db.session.add(OutboxMessage(
+                recipient=user.email,
+                subject="Reset your Pomoweb password",
+                body=f"Click to reset your password: {reset_link}",
+                html=f"<p>Click to reset your password: <a href='{reset_link}'>Reset password</a></p>",
+            ))
+            db.session.commit()
+
+        return render_template("forgot_sent.html")
+
+    return render_template("forgot.html")
+
+
+
+@main.route("/reset/<token>", methods=["GET", "POST"])
+def reset_password(token):
+    s = get_serializer()
+    try:
+        data = s.loads(token, max_age=3600)  
+    except SignatureExpired:
+        return render_template("reset.html", expired=True)
+    except BadSignature:
+        return render_template("reset.html", invalid=True)
+
+    user = User.query.get_or_404(data.get("uid"))
+
+    if request.method == "POST":
+        new_password = (request.form.get("password") or "").strip()
+        confirm = (request.form.get("confirm") or "").strip()
+        if not new_password or len(new_password) < 6:
+            return render_template("reset.html", token=token, error="Password must be at least 6 characters.")
+        if new_password != confirm:
+            return render_template("reset.html", token=token, error="Passwords do not match.")
+
+        try:
+            rate_limiter.check_attempt(request.remote_addr)
+            user.password = hash_pool.hash(new_password)
+        except (RateLimited, AuthBusy) as e:
+            return auth_refused("reset.html", e, token=token)
+        db.session.commit()
+        user_cache.invalidate(user.id)
+        return redirect(url_for("main.login"))
+
+    return render_template("reset.html", token=token)
@@ -0,0 +1,365 @@
+"""
+Benchmark the main routes against a dataset made with `flask seed-data`.
+
+    flask --app backend.app seed-data --users 200 --tasks 500
+    python benchmark.py                          # Flask test client, in process
+    python benchmark.py --gunicorn 8 -c 16       # starts gunicorn with 8 workers
+    python benchmark.py --url http://host:8000   # an already running server
+    python benchmark.py --out after.json --compare before.json
+    python benchmark.py --gunicorn 4 -c 8 --routes add_task,toggle_task --background admin,report
+
+Each route is driven as its own phase: `--concurrency` virtual users (each
+logged in as a different bench user) share `--requests` requests. The
+report gives p50/p95/p99 latency, requests/sec and SQL statements per
+request (from the X-Query-Count header, so a server started with --url
+needs QUERY_COUNT_HEADER=1 for those). With `--background`, more virtual
+users loop on the given routes for the whole run, to see how heavy reads
+affect the measured routes; their own numbers are reported as bg:<route>.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.cookiejar import CookieJar
+
+from sqlalchemy.engine import make_url
+
+
+ROUTES = ("login", "home", "tasks", "add_task", "toggle_task", "admin", "report")
+
+
+# ----- Clients -----
+class TestClient:
+    """A logged-in session on an in-process app via Flask's test client."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, form=None, json_body=None, headers=None):
+        response = self.client.open(
+            path, method=method, data=form, json=json_body, headers=headers or {}
+        )
+        return response.status_code, response.headers, response.get_data()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """A logged-in session against a running server, keeping its cookies."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect
+        )
+
+    def request(self, method, path, form=None, json_body=None, headers=None):
+        headers = dict(headers or {})
+        data = None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with self.opener.open(req, timeout=30) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+
+# ----- Gunicorn -----
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(workers):
+    port = _free_port()
+    # Every virtual user signs in from 127.0.0.1: lift the per-IP limit
+    env = dict(os.environ, QUERY_COUNT_HEADER="1", AUTH_RATE_LIMIT="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}",
+         "--log-level", "warning", "backend.app:create_app()"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("gunicorn exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("gunicorn did not start listening within 30s")
+
+
+# ----- Measurement -----
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds, status, headers, ok_statuses):
+        with self.lock:
+            self.latencies.append(seconds)
+            if status not in ok_statuses:
+                self.errors += 1
+            count = headers.get("X-Query-Count")
+            if count is not None:
+                self.queries.append(int(count))
+
+    def summary(self, wall_seconds):
+        lat = sorted(self.latencies)
+        if not lat:
+            return {"requests": 0, "errors": self.errors}
+        if len(lat) > 1:
+            cuts = statistics.quantiles(lat, n=100, method="inclusive")
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = lat[0]
+        return {
+            "requests": len(lat),
+            "errors": self.errors,
+            "rps": round(len(lat) / wall_seconds, 1) if wall_seconds else None,
+            "mean_ms": round(statistics.fmean(lat) * 1000, 2),
+            "p50_ms": round(p50 * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "p99_ms": round(p99 * 1000, 2),
+            "max_ms": round(lat[-1] * 1000, 2),
+            "queries_mean": round(statistics.fmean(self.queries), 2) if self.queries else None,
+            "queries_max": max(self.queries) if self.queries else None,
+        }
+
+
+def timed(stats, client, ok_statuses, method, path, **kwargs):
+    started = time.perf_counter()
+    status, headers, body = client.request(method, path, **kwargs)
+    stats.record(time.perf_counter() - started, status, headers, ok_statuses)
+    return status, body
+
+
+def run_phase(name, users, requests, step):
+    """Run `requests` calls of step(user, stats) spread over the users' threads."""
+    stats = RouteStats()
+    per_user = [requests // len(users) + (i < requests % len(users)) for i in range(len(users))]
+
+    def drive(i):
+        for _ in range(per_user[i]):
+            step(users[i], stats)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        list(pool.map(drive, range(len(users))))
+    result = stats.summary(time.perf_counter() - started)
+    print(f"  {name:<12} {_format(result)}")
+    return result
+
+
+def _format(r):
+    if not r.get("requests"):
+        return "no requests"
+    queries = f"{r['queries_mean']:>6} q/req" if r["queries_mean"] is not None else "     - q/req"
+    return (f"{r['requests']:>6} req {r['rps']:>8} req/s  p50 {r['p50_ms']:>7} ms  "
+            f"p95 {r['p95_ms']:>7} ms  p99 {r['p99_ms']:>7} ms  {queries}  {r['errors']} err")
+
+
+class VirtualUser:
+    def __init__(self, client, username, password):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.task_ids = []
+
+
+def benchmark(make_client, args):
+    users = [
+        VirtualUser(make_client(), f"{args.prefix}{i % args.users}", args.password)
+        for i in range(args.concurrency)
+    ]
+    admins = [VirtualUser(make_client(), args.admin_user, args.admin_password)
+              for _ in range(args.concurrency)]
+    xhr = {"X-Requested-With": "XMLHttpRequest"}
+
+    def login(user, stats):
+        timed(stats, user.client, (302,), "POST", "/login",
+              form={"identifier": user.username, "password": user.password})
+
+    def home(user, stats):
+        timed(stats, user.client, (200,), "GET", "/home")
+
+    def tasks(user, stats):
+        timed(stats, user.client, (200,), "GET", "/tasks")
+
+    def add_task(user, stats):
+        status, body = timed(stats, user.client, (200,), "POST", "/add_task",
+                             json_body={"description": "Benchmark task", "estimated": 2})
+        if status == 200:
+            user.task_ids.append(json.loads(body)["id"])
+
+    def toggle_task(user, stats):
+        if user.task_ids:
+            task_id = user.task_ids[len(stats.latencies) % len(user.task_ids)]
+            timed(stats, user.client, (200,), "POST", f"/toggle_task/{task_id}", headers=xhr)
+
+    def admin(user, stats):
+        timed(stats, user.client, (200,), "GET", "/admin")
+
+    def report(user, stats):
+        timed(stats, user.client, (200,), "GET", "/report")
+
+    steps = {"login": login, "home": home, "tasks": tasks,
+             "add_task": add_task, "toggle_task": toggle_task, "admin": admin,
+             "report": report}
+
+    background = []
+    for i in range(args.background_concurrency if args.background else 0):
+        name = args.background[i % len(args.background)]
+        if name == "admin":
+            user = VirtualUser(make_client(), args.admin_user, args.admin_password)
+        else:
+            user = VirtualUser(make_client(), f"{args.prefix}{i % args.users}", args.password)
+        background.append((name, user))
+
+    # Every session needs to be logged in whichever routes are measured
+    for user in users + admins + [user for _, user in background]:
+        user.client.request("POST", "/login",
+                            form={"identifier": user.username, "password": user.password})
+    if "toggle_task" in args.routes and "add_task" not in args.routes:
+        for user in users:
+            add_task(user, RouteStats())
+
+    stop = threading.Event()
+    bg_stats = {name: RouteStats() for name in args.background}
+
+    def loop(name, user):
+        while not stop.is_set():
+            steps[name](user, bg_stats[name])
+
+    threads = [threading.Thread(target=loop, args=item, daemon=True) for item in background]
+    for thread in threads:
+        thread.start()
+    started = time.perf_counter()
+
+    results = {}
+    try:
+        for name in args.routes:
+            results[name] = run_phase(name, admins if name == "admin" else users,
+                                      args.requests, steps[name])
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    for name, stats in bg_stats.items():
+        results[f"bg:{name}"] = stats.summary(time.perf_counter() - started)
+        print(f"  {'bg:' + name:<12} {_format(results[f'bg:{name}'])}")
+    return results
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["routes"]
+    print(f"\nCompared with {baseline_path}:")
+    for name, r in results.items():
+        old = baseline.get(name)
+        if not old or not r.get("requests") or not old.get("requests"):
+            continue
+        parts = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps", "queries_mean"):
+            if r.get(key) is None or not old.get(key):
+                continue
+            change = (r[key] - old[key]) / old[key] * 100
+            parts.append(f"{key} {old[key]} -> {r[key]} ({change:+.0f}%)")
+        print(f"  {name:<12} " + ", ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--gunicorn", type=int, metavar="WORKERS",
+                        help="Start gunicorn locally with this many workers.")
+    target.add_argument("--url", help="Benchmark an already running server.")
+    parser.add_argument("-n", "--requests", type=int, default=500, help="Requests per route.")
+    parser.add_argument("-c", "--concurrency", type=int, default=1)
+    parser.add_argument("--routes", default=",".join(ROUTES),
+                        help="Comma-separated subset of: " + ", ".join(ROUTES))
+    parser.add_argument("--background", default="",
+                        help="Routes to keep loading during the run, e.g. admin,report.")
+    parser.add_argument("--background-concurrency", type=int, default=4,
+                        help="Virtual users looping on the --background routes.")
+    parser.add_argument("--users", type=int, default=100,
+                        help="Number of seed-data users to log in as.")
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--password", default="bench123")
+    parser.add_argument("--admin-user", default="admin")
+    parser.add_argument("--admin-password", default=os.getenv("ADMIN_PASSWORD", "admin123"))
+    parser.add_argument("--out", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", metavar="JSON", help="Print changes against an earlier --out file.")
+    args = parser.parse_args()
+    args.routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    args.background = [r.strip() for r in args.background.split(",") if r.strip()]
+    unknown = set(args.routes + args.background) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    server = None
+    if args.url or args.gunicorn:
+        if args.gunicorn:
+            server, args.url = start_gunicorn(args.gunicorn)
+        mode = f"gunicorn ({args.gunicorn} workers)" if args.gunicorn else args.url
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+    else:
+        from backend.app import create_app
+        app = create_app({"QUERY_COUNT_HEADER": True, "AUTH_RATE_LIMIT": False})
+        mode = "test client"
+        make_client = lambda: TestClient(app)  # noqa: E731
+
+    print(f"Benchmarking {mode}: {args.requests} requests per route, concurrency {args.concurrency}")
+    try:
+        results = benchmark(make_client, args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "run": {
+                    "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "mode": mode,
+                    "requests": args.requests,
+                    "concurrency": args.concurrency,
+                    "background": args.background,
+                    "users": args.users,
+                    "database": make_url(os.getenv("DATABASE_URL", "sqlite:///users.db"))
+                    .render_as_string(hide_password=True),
+                },
+                "routes": results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ let mode = "pomodoro";
 let isRunning = false;
 let timerInterval = null;
 let timeLeft = 25 * 60;  
+let intervalStartedAt = null;
+let activeTaskId = Number(localStorage.getItem('pomoweb.activeTask')) || null;
 
 const modeDurations = { 
   pomodoro: 25 * 60, 
@@ -36,6 +38,7 @@ function toggleTimer() {
   const startBtn = document.getElementById('startBtn');
   if (!isRunning) {
     isRunning = true;
+    if (!intervalStartedAt) intervalStartedAt = new Date();
     startBtn.textContent = 'Pause';
     timerInterval = setInterval(() => {
       if (timeLeft > 0) {
@@ -45,6 +48,7 @@ function toggleTimer() {
         clearInterval(timerInterval);
         isRunning = false;
         startBtn.textContent = 'Start';
+        recordSession();
         alert("Time's up");
       }
     }, 1000);
@@ -55,6 +59,279 @@ function toggleTimer() {
   }
 }
 
+// ----- Session log -----
+// Finished intervals are queued in localStorage and sent to /api/sessions
+// in batches: periodically, and with sendBeacon when the page is hidden.
+// Each entry carries a client-generated id, so resending is harmless.
+const SESSION_QUEUE_KEY = 'pomoweb.sessionQueue';
+const SESSION_FLUSH_MS = 60 * 1000;
+const SESSION_BATCH_MAX = 100;
+let sessionFlushInFlight = false;
+
+function loadSessionQueue() {
+  try {
+    return JSON.parse(localStorage.getItem(SESSION_QUEUE_KEY)) || [];
+  } catch (e) {
+    return [];
+  }
+}
+
+function saveSessionQueue(queue) {
+  localStorage.setItem(SESSION_QUEUE_KEY, JSON.stringify(queue));
+}
+
+function newClientId() {
+  if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+}
+
+function recordSession() {
+  const endedAt = new Date();
+  const queue = loadSessionQueue();
+  queue.push({
+    id: newClientId(),
+    mode,
+    task_id: mode === 'pomodoro' ? activeTaskId : null,
+    started_at: (intervalStartedAt || endedAt).toISOString(),
+    ended_at: endedAt.toISOString(),
+    duration: modeDurations[mode]
+  });
+  saveSessionQueue(queue);
+  intervalStartedAt = null;
+}
+
+function flushSessions() {
+  const batch = loadSessionQueue().slice(0, SESSION_BATCH_MAX);
+  if (!batch.length || sessionFlushInFlight) return;
+
+  sessionFlushInFlight = true;
+  fetch('/api/sessions', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-Requested-With': 'XMLHttpRequest'
+    },
+    body: JSON.stringify({ sessions: batch })
+  })
+  .then(r => {
+    if (!r.ok) throw new Error(`HTTP ${r.status}`);
+    const sent = new Set(batch.map(s => s.id));
+    saveSessionQueue(loadSessionQueue().filter(s => !sent.has(s.id)));
+  })
+  .catch(err => console.error("Error sending sessions:", err))
+  .finally(() => { sessionFlushInFlight = false; });
+}
+
+function beaconSessions() {
+  const batch = loadSessionQueue().slice(0, SESSION_BATCH_MAX);
+  if (!batch.length || !navigator.sendBeacon) return;
+  const body = new Blob([JSON.stringify({ sessions: batch })], { type: 'application/json' });
+  navigator.sendBeacon('/api/sessions', body);
+}
+
+// Attribute focus intervals to the task whose description was clicked
+function setActiveTask(taskId) {
+  activeTaskId = activeTaskId === taskId ? null : taskId;
+  if (activeTaskId) {
+    localStorage.setItem('pomoweb.activeTask', activeTaskId);
+  } else {
+    localStorage.removeItem('pomoweb.activeTask');
+  }
+  highlightActiveTask();
+}
+
+function highlightActiveTask() {
+  document.querySelectorAll('#taskList .task-desc').forEach(el => el.classList.remove('font-semibold', 'text-accent-700'));
+  const el = activeTaskId && document.querySelector(`#task-${activeTaskId} .task-desc`);
+  if (el) el.classList.add('font-semibold', 'text-accent-700');
+}
+
+// ----- Task actions -----
+// Actions made within TASK_BATCH_WINDOW_MS of each other are sent together
+// to /api/tasks/batch; each caller's promise resolves with its own result.
+// Every op is safe to replay (adds carry a client_id, toggles the state
+// wanted), so when the network is down they go to the offline queue below
+// and the caller gets the result the server will give once it is back.
+const TASK_BATCH_WINDOW_MS = 150;
+const TASK_BATCH_MAX = 100;
+let pendingTaskOps = [];
+let taskBatchTimer = null;
+
+function queueTaskOp(op) {
+  if (op.op === 'add' && !op.client_id) op.client_id = newClientId();
+  return new Promise((resolve, reject) => {
+    pendingTaskOps.push({ op, resolve, reject });
+    if (pendingTaskOps.length >= TASK_BATCH_MAX) {
+      flushTaskOps();
+    } else if (!taskBatchTimer) {
+      taskBatchTimer = setTimeout(flushTaskOps, TASK_BATCH_WINDOW_MS);
+    }
+  });
+}
+
+function flushTaskOps() {
+  clearTimeout(taskBatchTimer);
+  taskBatchTimer = null;
+  const batch = pendingTaskOps;
+  pendingTaskOps = [];
+  if (!batch.length) return;
+
+  // Keep ops in order behind anything still waiting to be replayed
+  if (!navigator.onLine || loadTaskQueue().length) {
+    deferTaskOps(batch);
+    replayTaskOps();
+    return;
+  }
+
+  fetch('/api/tasks/batch', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-Requested-With': 'XMLHttpRequest'
+    },
+    body: JSON.stringify({ ops: batch.map(b => b.op) })
+  })
+  .then(r => {
+    if (!r.ok) throw new Error(`HTTP ${r.status}`);
+    return r.json();
+  })
+  .then(data => batch.forEach((b, i) => b.resolve(data.results[i])))
+  .catch(err => {
+    // fetch() rejects with a TypeError when the request never completed
+    if (err instanceof TypeError) {
+      deferTaskOps(batch);
+    } else {
+      batch.forEach(b => b.reject(err));
+    }
+  });
+}
+
+// ----- Offline queue -----
+// Ops that could not be sent are kept in localStorage, per user, and
+// replayed in order when the browser is back online. A task added offline
+// gets a negative temporary id until its add is replayed; later ops that
+// refer to it are rewritten to the real id before they are sent.
+const TASK_USER_ID = document.currentScript ? document.currentScript.dataset.userId : null;
+const TASK_QUEUE_KEY = `pomoweb.taskQueue.${TASK_USER_ID}`;
+const TEMP_IDS_KEY = `pomoweb.tempTaskIds.${TASK_USER_ID}`;
+const TASK_REPLAY_RETRY_MS = 30 * 1000;
+let taskReplayInFlight = false;
+let tempIdSeq = 0;
+
+function loadTaskQueue() {
+  try {
+    return JSON.parse(localStorage.getItem(TASK_QUEUE_KEY)) || [];
+  } catch (e) {
+    return [];
+  }
+}
+
+function saveTaskQueue(queue) {
+  localStorage.setItem(TASK_QUEUE_KEY, JSON.stringify(queue));
+}
+
+function loadTempIds() {
+  try {
+    return JSON.parse(localStorage.getItem(TEMP_IDS_KEY)) || {};
+  } catch (e) {
+    return {};
+  }
+}
+
+function deferTaskOps(batch) {
+  const queue = loadTaskQueue();
+  batch.forEach(({ op, resolve }) => {
+    if (op.op === 'add') {
+      op.temp_id = -(Date.now() * 100 + (tempIdSeq++ % 100));
+      queue.push(op);
+      resolve({
+        success: true,
+        id: op.temp_id,
+        description: op.description,
+        estimated: op.estimated,
+        completed: false,
+        assigned_by_admin: false
+      });
+    } else {
+      queue.push(op);
+      resolve({ success: true, id: op.id, completed: op.completed });
+    }
+  });
+  saveTaskQueue(queue);
+}
+
+// Give a task added offline its real id, in the page and for later ops
+function adoptTaskId(tempId, task) {
+  const el = document.getElementById(`task-${tempId}`);
+  if (el) {
+    el.replaceWith(task.completed ? buildCompletedTaskElement(task) : buildTaskElement(task));
+  }
+  if (activeTaskId === tempId) {
+    activeTaskId = null;
+    setActiveTask(task.id);
+  }
+}
+
+function replayTaskOps() {
+  if (taskReplayInFlight || !navigator.onLine) return;
+  const queue = loadTaskQueue();
+  if (!queue.length) {
+    localStorage.removeItem(TEMP_IDS_KEY);
+    syncTasks();
+    return;
+  }
+
+  // An op on a task added offline has to wait until that add is replayed
+  const tempIds = loadTempIds();
+  const chunk = [];
+  for (const op of queue) {
+    if (chunk.length >= TASK_BATCH_MAX) break;
+    if (op.id < 0 && !(op.id in tempIds)) {
+      if (chunk.length) break;
+      chunk.push(null);   // its add was rejected: nothing to apply
+      continue;
+    }
+    chunk.push(op.id < 0 ? { ...op, id: tempIds[op.id] } : op);
+  }
+  const ops = chunk.filter(Boolean);
+
+  taskReplayInFlight = true;
+  const sent = ops.length ? fetch('/api/tasks/batch', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-Requested-With': 'XMLHttpRequest'
+    },
+    body: JSON.stringify({ ops })
+  }).then(r => {
+    if (!r.ok) throw new Error(`HTTP ${r.status}`);
+    return r.json();
+  }) : Promise.resolve({ results: [] });
+
+  sent.then(data => {
+    const ids = loadTempIds();
+    ops.forEach((op, i) => {
+      const result = data.results[i];
+      if (op.op !== 'add') return;
+      if (result && result.success) {
+        ids[op.temp_id] = result.id;
+        adoptTaskId(op.temp_id, result);
+      } else {
+        removeTask(op.temp_id);
+      }
+    });
+    localStorage.setItem(TEMP_IDS_KEY, JSON.stringify(ids));
+    // New ops are only ever appended, so the replayed ones are in front
+    saveTaskQueue(loadTaskQueue().slice(chunk.length));
+    taskReplayInFlight = false;
+    replayTaskOps();
+  })
+  .catch(err => {
+    taskReplayInFlight = false;
+    console.error("Error replaying offline task changes:", err);
+  });
+}
+
 // Toggle Task completion (without pausing the timer)
 function toggleTask(taskId) {
   const togglePopup = document.getElementById("toggleTaskPopup");
@@ -87,19 +364,12 @@ function deleteTask(taskId) {
 
 // Handle Task Deletion from DOM
 function deleteTaskFromList(taskId) {
-  fetch(`/delete_task/${taskId}`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      'X-Requested-With': 'XMLHttpRequest'
-    },
-    body: JSON.stringify({})
-  })
-  .then(r => r.json())
+  queueTaskOp({ op: 'delete', id: taskId })
   .then(data => {
     if (data.success) {
       const el = document.getElementById(`task-${taskId}`);
       if (el) el.remove();
+      if (activeTaskId === taskId) setActiveTask(taskId);
     } else {
       console.error("Error deleting task:", data.error);
     }
@@ -109,21 +379,18 @@ function deleteTaskFromList(taskId) {
 
 // Mark Task as Complete (without pausing the timer)
 function toggleTaskComplete(taskId) {
-  fetch(`/toggle_task/${taskId}`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      'X-Requested-With': 'XMLHttpRequest'
-    },
-    body: JSON.stringify({})
-  })
-  .then(r => r.json())
+  // Ask for the opposite of what is shown, so a replay cannot flip it back
+  const shown = document.getElementById(`task-${taskId}`);
+  const completed = !(shown && shown.parentElement.id === 'completedTaskList');
+  queueTaskOp({ op: 'toggle', id: taskId, completed })
   .then(data => {
     if (!data.success) {
       console.error("Error toggling task:", data.error);
       return;
     }
 
+    if (data.completed && activeTaskId === taskId) setActiveTask(taskId);
+
     const taskElement = document.getElementById(`task-${taskId}`);
     if (!taskElement) return;
 
@@ -147,55 +414,105 @@ function toggleTaskComplete(taskId) {
     }
 
     // move between lists
-    if (data.completed) {
-      document.getElementById('completedTaskList').appendChild(taskElement);
-    } else {
-      document.getElementById('taskList').appendChild(taskElement);
-    }
+    const target = document.getElementById(data.completed ? 'completedTaskList' : 'taskList');
+    clearEmptyState(target);
+    target.prepend(taskElement);
   })
   .catch(err => console.error("Error:", err));
 }
 
+function escapeHtml(text) {
+  const div = document.createElement('div');
+  div.textContent = text;
+  return div.innerHTML;
+}
+
+function clearEmptyState(list) {
+  const empty = list.querySelector('.empty-state');
+  if (empty) empty.remove();
+}
+
+// Build a pending task row (same markup as home.html)
+function buildTaskElement(task) {
+  const el = document.createElement("div");
+  el.className = "flex items-center justify-between bg-white/70 rounded-xl border border-slate-200 p-3";
+  el.id = `task-${task.id}`;
+  el.innerHTML = `
+    <div class="flex items-center gap-3">
+      <form id="toggle-task-${task.id}" class="task-form" data-task-id="${task.id}">
+        <button type="button" class="h-5 w-5 rounded-full border border-slate-300 flex items-center justify-center" onclick="toggleTask(${task.id})"></button>
+      </form>
+      <span class="task-desc cursor-pointer" title="Focus on this task" onclick="setActiveTask(${task.id})">${escapeHtml(task.description)}</span>
+      ${task.assigned_by_admin ? `
+        <span class="ml-2 inline-flex items-center gap-1 text-[11px] px-2 py-0.5 rounded-full bg-amber-100 text-amber-700" title="Assigned by admin">
+          <svg xmlns="http://www.w3.org/2000/svg" class="w-3.5 h-3.5" viewBox="0 0 24 24" fill="currentColor">
+            <path d="M12 2l7 3v6c0 5-3.8 8.6-7 9-3.2-.4-7-4-7-9V5l7-3z"/>
+          </svg>
+          admin
+        </span>` : ``}
+    </div>
+    <form id="delete-task-${task.id}" class="task-form" data-task-id="${task.id}">
+      <button type="button" onclick="deleteTask(${task.id})" class="text-slate-500 hover:text-red-600" title="Delete">Delete</button>
+    </form>
+  `;
+  return el;
+}
+
+// Build a completed task row (same markup as home.html)
+function buildCompletedTaskElement(task) {
+  const el = document.createElement("div");
+  el.className = "flex items-center justify-between bg-white/70 rounded-xl border border-slate-200 p-3";
+  el.id = `task-${task.id}`;
+  el.innerHTML = `
+    <div class="flex items-center gap-3">
+      <span class="line-through text-slate-400">${escapeHtml(task.description)}</span>
+    </div>
+  `;
+  return el;
+}
+
+// Fetch the next page of a task list from /api/tasks and append it
+function loadMoreTasks(btn) {
+  const cursor = btn.dataset.next;
+  if (!cursor) return;
+
+  const list = document.getElementById(btn.dataset.list);
+  const completed = btn.dataset.completed === "1";
+  const params = new URLSearchParams({ completed: btn.dataset.completed, cursor });
+
+  btn.disabled = true;
+  fetch(`/api/tasks?${params}`, {
+    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+  })
+  .then(r => r.json())
+  .then(data => {
+    (data.tasks || []).forEach(task => {
+      if (document.getElementById(`task-${task.id}`)) return;
+      list.appendChild(completed ? buildCompletedTaskElement(task) : buildTaskElement(task));
+    });
+    btn.dataset.next = data.next || "";
+    btn.classList.toggle("hidden", !data.next);
+    highlightActiveTask();
+  })
+  .catch(err => console.error("Error loading tasks:", err))
+  .finally(() => { btn.disabled = false; });
+}
+
 // Add New Task
 function addTask(event) {
   event.preventDefault();
   const description = document.getElementById("taskDescription").value.trim();
   if (!description) return;
 
-  fetch("/add_task", {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      'X-Requested-With': 'XMLHttpRequest'
-    },
-    body: JSON.stringify({ description, estimated: 1 })
-  })
-  .then(r => r.json())
+  queueTaskOp({ op: 'add', description, estimated: 1 })
   .then(data => {
     if (data.id) {
-      const taskList = document.getElementById("taskList");
-      const newTask = document.createElement("div");
-      newTask.className = "flex items-center justify-between bg-white/70 rounded-xl border border-slate-200 p-3";
-      newTask.id = `task-${data.id}`;
-      newTask.innerHTML = `
-        <div class="flex items-center gap-3">
-          <form id="toggle-task-${data.id}" class="task-form" data-task-id="${data.id}">
-            <button type="button" class="h-5 w-5 rounded-full border border-slate-300 flex items-center justify-center" onclick="toggleTask(${data.id})"></button>
-          </form>
-          <span class="task-desc">${data.description}</span>
-          ${data.assigned_by_admin ? `
-            <span class="ml-2 inline-flex items-center gap-1 text-[11px] px-2 py-0.5 rounded-full bg-amber-100 text-amber-700" title="Assigned by admin">
-              <svg xmlns="http://www.w3.org/2000/svg" class="w-3.5 h-3.5" viewBox="0 0 24 24" fill="currentColor">
-                <path d="M12 2l7 3v6c0 5-3.8 8.6-7 9-3.2-.4-7-4-7-9V5l7-3z"/>
-              </svg>
-              admin
-            </span>` : ``}
-        </div>
-        <form id="delete-task-${data.id}" class="task-form" data-task-id="${data.id}">
-          <button type="button" onclick="deleteTask(${data.id})" class="text-slate-500 hover:text-red-600" title="Delete">Delete</button>
-        </form>
-      `;
-      taskList.appendChild(newTask);
+      // The live feed may already have inserted it
+      if (!document.getElementById(`task-${data.id}`)) {
+        const taskList = document.getElementById("taskList");
+        clearEmptyState(taskList);
+        taskList.prepend(buildTaskElement(data));
+      }
       document.getElementById("taskDescription").value = "";
       closeTaskModal();
     }
@@ -203,12 +520,127 @@ function addTask(event) {
   .catch(err => console.error("Error adding task:", err));
 }
 
+// ----- Live updates -----
+// /events says when this user's tasks change elsewhere: another tab or
+// device, or an admin assignment. Each event (and each reconnect, which
+// may have missed some) just schedules a delta sync.
+let taskEventsConnected = false;
+
+function placeTask(task) {
+  const listId = task.completed ? 'completedTaskList' : 'taskList';
+  const existing = document.getElementById(`task-${task.id}`);
+  if (existing && existing.parentElement.id === listId) return;
+  if (existing) existing.remove();
+
+  const list = document.getElementById(listId);
+  clearEmptyState(list);
+  list.prepend(task.completed ? buildCompletedTaskElement(task) : buildTaskElement(task));
+  if (task.completed && activeTaskId === task.id) setActiveTask(task.id);
+  highlightActiveTask();
+}
+
+function removeTask(taskId) {
+  const el = document.getElementById(`task-${taskId}`);
+  if (el) el.remove();
+  if (activeTaskId === taskId) setActiveTask(taskId);
+}
+
+function connectTaskEvents() {
+  if (!window.EventSource) return;
+  const source = new EventSource('/events');
+  source.addEventListener('open', () => {
+    if (taskEventsConnected) scheduleSync();
+    taskEventsConnected = true;
+  });
+  ['task.created', 'task.updated', 'task.deleted', 'tasks.assigned', 'resync'].forEach(type => {
+    source.addEventListener(type, scheduleSync);
+  });
+}
+
+// ----- Delta sync -----
+// The lists Home rendered are kept current from /api/tasks/changes,
+// starting at the cursor the page was rendered at, so only what changed
+// after it is fetched. When the feed answers with a reset (the cursor
+// predates pruned tombstones or archived tasks) the first page of each
+// list is loaded again instead of replaying the whole history.
+const SYNC_DEBOUNCE_MS = 250;
+let syncCursor = document.currentScript ? document.currentScript.dataset.syncCursor || '' : '';
+let syncInFlight = false;
+let syncAgain = false;
+let syncTimer = null;
+
+function fetchJson(url) {
+  return fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } }).then(r => {
+    if (!r.ok) throw new Error(`HTTP ${r.status}`);
+    return r.json();
+  });
+}
+
+// Replace a list's rows with its first page; rows of tasks added offline
+// and not yet replayed (negative ids) stay
+function reloadTaskList(btn) {
+  const list = document.getElementById(btn.dataset.list);
+  const completed = btn.dataset.completed === "1";
+  return fetchJson(`/api/tasks?completed=${btn.dataset.completed}`).then(data => {
+    list.querySelectorAll('[id^="task-"]:not([id^="task--"])').forEach(el => el.remove());
+    data.tasks.forEach(task => {
+      clearEmptyState(list);
+      list.appendChild(completed ? buildCompletedTaskElement(task) : buildTaskElement(task));
+    });
+    btn.dataset.next = data.next || "";
+    btn.classList.toggle("hidden", !data.next);
+  });
+}
+
+function syncTasks() {
+  if (syncInFlight) {
+    syncAgain = true;
+    return;
+  }
+  if (!navigator.onLine) return;
+  syncInFlight = true;
+
+  (function pull() {
+    return fetchJson(`/api/tasks/changes?since=${encodeURIComponent(syncCursor)}&snapshot=0`)
+    .then(data => {
+      if (data.reset) {
+        // The cursor comes first: anything changed while the lists load is
+        // after it and is applied by the next sync
+        return Promise.all(['taskListMore', 'completedTaskListMore'].map(id =>
+          reloadTaskList(document.getElementById(id))
+        )).then(() => {
+          syncCursor = data.cursor;
+          highlightActiveTask();
+        });
+      }
+      data.deleted.forEach(removeTask);
+      data.tasks.forEach(placeTask);
+      syncCursor = data.cursor;
+      if (data.more) return pull();
+    });
+  })()
+  .catch(err => console.error("Error syncing tasks:", err))
+  .finally(() => {
+    syncInFlight = false;
+    if (syncAgain) {
+      syncAgain = false;
+      syncTasks();
+    }
+  });
+}
+
+function scheduleSync() {
+  clearTimeout(syncTimer);
+  syncTimer = setTimeout(syncTasks, SYNC_DEBOUNCE_MS);
+}
+
 
 document.getElementById("addTaskForm").addEventListener("submit", addTask);
 
 function resetTimer() { 
   clearInterval(timerInterval); 
   isRunning = false; 
+  intervalStartedAt = null;
   timeLeft = modeDurations[mode]; 
   updateTimerDisplay(); 
   document.getElementById('startBtn').textContent = 'Start'; 
@@ -224,3 +656,15 @@ function closeTaskModal() {
 
 highlightModeButton();
 updateTimerDisplay();
+highlightActiveTask();
+connectTaskEvents();
+if (loadTaskQueue().length) replayTaskOps();
+window.addEventListener('online', replayTaskOps);
+setInterval(() => { if (loadTaskQueue().length) replayTaskOps(); }, TASK_REPLAY_RETRY_MS);
+
+flushSessions();
+setInterval(flushSessions, SESSION_FLUSH_MS);
+document.addEventListener('visibilitychange', () => {
+  if (document.visibilityState === 'hidden') beaconSessions();
+});
+window.addEventListener('pagehide', beaconSessions);
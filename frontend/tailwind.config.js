@@ -0,0 +1,25 @@
+/** Theme for the Tailwind build, loaded by tailwind.css (see backend/assets.py). */
+module.exports = {
+  content: {
+    relative: true,
+    files: ['./templates/**/*.html', './static/js/**/*.js'],
+  },
+  theme: {
+    extend: {
+      fontFamily: {
+        // System fonts only: no web font is shipped or fetched
+        sans: ['ui-sans-serif', 'system-ui', '-apple-system', 'Segoe UI', 'Roboto',
+               'Helvetica Neue', 'Arial', 'sans-serif'],
+      },
+      colors: {
+        accent: {
+          50: '#EDF8F5', 100: '#D9F1EA', 200: '#B7E3D5', 300: '#8FD2BD', 400: '#68C2A6',
+          500: '#45B190', 600: '#329C7E', 700: '#2A7B65', 800: '#225E50', 900: '#17443A'
+        }
+      },
+      boxShadow: {
+        soft: '0 10px 40px rgba(0,0,0,0.06)'
+      }
+    }
+  }
+}
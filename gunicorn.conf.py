@@ -0,0 +1,34 @@
+import os
+
+# gevent workers serve each request in a greenlet, so the long-lived
+# /events streams cost a few KB each instead of a whole worker. Set
+# GUNICORN_WORKER_CLASS=sync to go back to one request per process.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 2000))
+
+if worker_class == "gevent":
+    # Patch before the app is preloaded below, so locks, queues and sockets
+    # created at import time are already cooperative.
+    from gevent import monkey
+    monkey.patch_all()
+
+    # monkey.patch_all() cannot reach psycopg2, which waits on its socket
+    # in C and would stall every greenlet in the worker during a query.
+    from importlib.util import find_spec
+    if find_spec("psycopg2") is not None:
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            raise RuntimeError(
+                "psycopg2 is installed with gevent workers but the 'psycogreen' package is not installed"
+            )
+        patch_psycopg()
+
+# Load the app once in the master and fork workers from it, so each worker
+# starts without re-importing Flask, SQLAlchemy and the views.
+preload_app = True
+
+
+def post_fork(server, worker):
+    from backend.app import dispose_engines
+    dispose_engines(worker.app.wsgi())
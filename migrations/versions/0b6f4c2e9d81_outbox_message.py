@@ -0,0 +1,45 @@
+"""add outbox_message mail queue
+
+Revision ID: 0b6f4c2e9d81
+Revises: e15b3d8a6f27
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6f4c2e9d81'
+down_revision = 'e15b3d8a6f27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'outbox_message',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('recipient', sa.String(length=255), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('html', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_outbox_message_status_next_attempt', 'outbox_message',
+        ['status', 'next_attempt_at'],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_outbox_message_status_next_attempt', table_name='outbox_message')
+    op.drop_table('outbox_message')
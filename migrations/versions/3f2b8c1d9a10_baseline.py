@@ -0,0 +1,56 @@
+"""baseline schema
+
+Revision ID: 3f2b8c1d9a10
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2b8c1d9a10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created before migrations existed already have these tables
+    # (from db.create_all()); only create what is missing so they can be
+    # brought under Alembic with a plain `flask db upgrade`.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'user' not in existing:
+        op.create_table(
+            'user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=150), nullable=False),
+            sa.Column('email', sa.String(length=255), nullable=True),
+            sa.Column('password', sa.String(length=150), nullable=False),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username'),
+        )
+
+    if 'task' not in existing:
+        op.create_table(
+            'task',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('description', sa.String(length=255), nullable=False),
+            sa.Column('estimated', sa.Integer(), nullable=True),
+            sa.Column('completed', sa.Boolean(), nullable=True),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.Column('assigned_by_admin', sa.Boolean(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def downgrade():
+    op.drop_table('task')
+    op.drop_table('user')
@@ -0,0 +1,30 @@
+"""add user.data_version for conditional GET
+
+Revision ID: 5a2d7e9c3b48
+Revises: 0b6f4c2e9d81
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a2d7e9c3b48'
+down_revision = '0b6f4c2e9d81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('user')}
+    if 'data_version' not in existing:
+        op.add_column(
+            'user',
+            sa.Column('data_version', sa.Integer(), server_default='0', nullable=False),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,50 @@
+"""add hot-path indexes on task listings and email lookup
+
+Revision ID: 8d41e6a7b2c5
+Revises: 3f2b8c1d9a10
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41e6a7b2c5'
+down_revision = '3f2b8c1d9a10'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns) — columns may be SQL expressions
+INDEXES = [
+    # home(): pending/completed lists, newest first
+    ('ix_task_user_completed_timestamp', 'task', ['user_id', 'completed', 'timestamp']),
+    # tasks() and /api/tasks without a completed filter
+    ('ix_task_user_timestamp', 'task', ['user_id', 'timestamp']),
+    # login and /forgot: lower(email) == :identifier
+    ('ix_user_email_lower', 'user', [sa.text('lower(email)')]),
+]
+
+
+def upgrade():
+    # On Postgres, build the indexes CONCURRENTLY outside the migration
+    # transaction so writes to task/user are not blocked while they build.
+    # SQLite ignores the dialect option and builds them normally.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,90 @@
+"""add full-text search index on task.description
+
+Revision ID: 9c3e5f7a1d24
+Revises: 5a2d7e9c3b48
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3e5f7a1d24'
+down_revision = '5a2d7e9c3b48'
+branch_labels = None
+depends_on = None
+
+
+# Kept in step with backend/search.py, which issues the same DDL for
+# db.create_all().
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        owner, description, content='',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF user_id, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+    # Index existing tasks (a no-op when the table was already filled)
+    """
+    INSERT INTO task_fts(rowid, owner, description)
+    SELECT id, 'u' || user_id, description FROM task
+    WHERE NOT EXISTS (SELECT 1 FROM task_fts LIMIT 1)
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS task_fts_update",
+    "DROP TRIGGER IF EXISTS task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_fts_insert",
+    "DROP TABLE IF EXISTS task_fts",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        # Adding a STORED generated column rewrites the table once; the GIN
+        # index is then built CONCURRENTLY so writes continue meanwhile.
+        op.execute(
+            "ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED"
+        )
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_search_vector "
+                "ON task USING gin (search_vector)"
+            )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_task_search_vector")
+        op.execute("ALTER TABLE task DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,75 @@
+"""never reuse task ids on SQLite
+
+Revision ID: a3c8e5d1f7b4
+Revises: f4a1c9e7b3d2
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c8e5d1f7b4'
+down_revision = 'f4a1c9e7b3d2'
+branch_labels = None
+depends_on = None
+
+
+# Without AUTOINCREMENT SQLite hands out max(id) + 1, so deleting or
+# archiving the newest task frees its id for the next one, clashing with
+# its tombstone or task_archive row. Postgres sequences never go back, so
+# there is nothing to do there.
+#
+# Rebuilding the table drops its triggers; these are kept in step with
+# backend/search.py and 9c3e5f7a1d24.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF user_id, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+]
+
+
+def _rebuild_task(autoincrement):
+    with op.batch_alter_table(
+        'task', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement},
+    ):
+        pass
+    for statement in SQLITE_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_task(True)
+    # Start past every id a task has had, including archived and deleted ones
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'task'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'task', coalesce(max(id), 0) FROM ("
+        " SELECT max(id) AS id FROM task"
+        " UNION ALL SELECT max(id) FROM task_archive"
+        " UNION ALL SELECT max(task_id) FROM task_tombstone)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_task(False)
@@ -0,0 +1,78 @@
+"""index archived tasks for search
+
+Revision ID: b5d9f1e3a7c2
+Revises: a3c8e5d1f7b4
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d9f1e3a7c2'
+down_revision = 'a3c8e5d1f7b4'
+branch_labels = None
+depends_on = None
+
+
+# Kept in step with backend/search.py, which issues the same DDL for
+# db.create_all(). Archived tasks keep their ids, so on SQLite they share
+# task_fts with the live ones.
+SQLITE_UPGRADE = [
+    """
+    CREATE TRIGGER IF NOT EXISTS task_archive_fts_insert AFTER INSERT ON task_archive BEGIN
+        INSERT INTO task_fts(rowid, owner, description)
+        VALUES (new.id, 'u' || new.user_id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_archive_fts_delete AFTER DELETE ON task_archive BEGIN
+        INSERT INTO task_fts(task_fts, rowid, owner, description)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.description);
+    END
+    """,
+    # Tasks archived so far left task_fts when they left task
+    """
+    INSERT INTO task_fts(rowid, owner, description)
+    SELECT id, 'u' || user_id, description FROM task_archive
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    """
+    INSERT INTO task_fts(task_fts, rowid, owner, description)
+    SELECT 'delete', id, 'u' || user_id, description FROM task_archive
+    """,
+    "DROP TRIGGER IF EXISTS task_archive_fts_delete",
+    "DROP TRIGGER IF EXISTS task_archive_fts_insert",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        # As in 9c3e5f7a1d24: one table rewrite for the generated column,
+        # then the GIN index is built CONCURRENTLY
+        op.execute(
+            "ALTER TABLE task_archive ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED"
+        )
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_archive_search_vector "
+                "ON task_archive USING gin (search_vector)"
+            )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_task_archive_search_vector")
+        op.execute("ALTER TABLE task_archive DROP COLUMN IF EXISTS search_vector")
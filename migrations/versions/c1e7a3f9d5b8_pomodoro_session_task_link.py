@@ -0,0 +1,56 @@
+"""drop the pomodoro_session.task_id foreign key
+
+Revision ID: c1e7a3f9d5b8
+Revises: b5d9f1e3a7c2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1e7a3f9d5b8'
+down_revision = 'b5d9f1e3a7c2'
+branch_labels = None
+depends_on = None
+
+
+# The key referenced task.id with ON DELETE SET NULL, so on Postgres
+# archiving a task wiped the link from its sessions. Task ids are never
+# reused and archived tasks keep theirs, so the plain id now names the
+# task in either table.
+
+# e15b3d8a6f27 left the SQLite constraint unnamed; batch mode finds it
+# through this convention
+SQLITE_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+SQLITE_FK = 'fk_pomodoro_session_task_id_task'
+POSTGRES_FK = 'pomodoro_session_task_id_fkey'
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table(
+            'pomodoro_session', naming_convention=SQLITE_CONVENTION,
+        ) as batch_op:
+            batch_op.drop_constraint(SQLITE_FK, type_='foreignkey')
+    else:
+        op.drop_constraint(POSTGRES_FK, 'pomodoro_session', type_='foreignkey')
+
+
+def downgrade():
+    # Links to archived or deleted tasks cannot be kept under the key
+    op.execute(
+        "UPDATE pomodoro_session SET task_id = NULL "
+        "WHERE task_id IS NOT NULL AND task_id NOT IN (SELECT id FROM task)"
+    )
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table(
+            'pomodoro_session', naming_convention=SQLITE_CONVENTION,
+        ) as batch_op:
+            batch_op.create_foreign_key(
+                SQLITE_FK, 'task', ['task_id'], ['id'], ondelete='SET NULL',
+            )
+    else:
+        op.create_foreign_key(
+            POSTGRES_FK, 'pomodoro_session', 'task', ['task_id'], ['id'], ondelete='SET NULL',
+        )
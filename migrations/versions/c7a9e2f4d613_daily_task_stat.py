@@ -0,0 +1,36 @@
+"""add daily_task_stat reporting rollup
+
+Revision ID: c7a9e2f4d613
+Revises: 8d41e6a7b2c5
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a9e2f4d613'
+down_revision = '8d41e6a7b2c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Run `flask report-backfill` afterwards to populate it from history.
+    op.create_table(
+        'daily_task_stat',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('tasks_created', sa.Integer(), nullable=False),
+        sa.Column('tasks_completed', sa.Integer(), nullable=False),
+        sa.Column('estimated_pomodoros', sa.Integer(), nullable=False),
+        sa.Column('completion_seconds', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('user_id', 'day'),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table('daily_task_stat')
@@ -0,0 +1,45 @@
+"""add pomodoro_session log
+
+Revision ID: e15b3d8a6f27
+Revises: c7a9e2f4d613
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e15b3d8a6f27'
+down_revision = 'c7a9e2f4d613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'pomodoro_session',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=True),
+        sa.Column('client_id', sa.String(length=36), nullable=False),
+        sa.Column('mode', sa.String(length=16), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('ended_at', sa.DateTime(), nullable=False),
+        sa.Column('duration', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['task.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'client_id', name='uq_pomodoro_session_user_client'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_pomodoro_session_user_started', 'pomodoro_session',
+        ['user_id', 'started_at'],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_pomodoro_session_user_started', table_name='pomodoro_session')
+    op.drop_table('pomodoro_session')
@@ -0,0 +1,43 @@
+"""widen user.password to fit scrypt hashes
+
+Revision ID: e8b2d6f4a9c3
+Revises: c1e7a3f9d5b8
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b2d6f4a9c3'
+down_revision = 'c1e7a3f9d5b8'
+branch_labels = None
+depends_on = None
+
+
+# Werkzeug's scrypt hashes run to about 160 characters, past the 150 the
+# column was created with. Postgres rejects them; SQLite never enforced
+# the length. Widening a varchar on Postgres only touches the catalog, so
+# the table is not rewritten.
+
+
+def _alter_password(old, new):
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.alter_column('password', type_=new, existing_type=old, existing_nullable=False)
+        # Batch mode rebuilds the table without the expression index from
+        # 8d41e6a7b2c5, as reflection skips it
+        op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], if_not_exists=True)
+    else:
+        op.alter_column('user', 'password', type_=new, existing_type=old, existing_nullable=False)
+
+
+def upgrade():
+    _alter_password(sa.String(length=150), sa.String(length=255))
+
+
+def downgrade():
+    # Postgres refuses this while any stored hash is longer than 150
+    # characters, rather than truncating it
+    _alter_password(sa.String(length=255), sa.String(length=150))
@@ -0,0 +1,71 @@
+"""add task_archive for completed tasks moved out of task
+
+Revision ID: f4a1c9e7b3d2
+Revises: d2f8a4c6e1b9
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a1c9e7b3d2'
+down_revision = 'd2f8a4c6e1b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'task_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=False),
+        sa.Column('estimated', sa.Integer(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('assigned_by_admin', sa.Boolean(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_task_archive_user_timestamp', 'task_archive', ['user_id', 'timestamp']
+    )
+    # Built CONCURRENTLY on Postgres, as in 8d41e6a7b2c5, so task writes
+    # are not blocked while it builds
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_task_completed_at', 'task', ['completed_at'],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    # Archived tasks go back to the live table first, as a fresh change of
+    # their owners that every synced browser cache has to pick up
+    user = sa.table('user', sa.column('id'), sa.column('data_version'), sa.column('sync_floor'))
+    archive = sa.table('task_archive', sa.column('user_id'))
+    op.execute(
+        user.update()
+        .where(user.c.id.in_(sa.select(archive.c.user_id)))
+        .values(data_version=user.c.data_version + 1, sync_floor=user.c.data_version + 1)
+    )
+    op.execute(
+        "INSERT INTO task (id, user_id, description, estimated, completed, timestamp, "
+        "completed_at, assigned_by_admin, change_seq) "
+        "SELECT a.id, a.user_id, a.description, a.estimated, a.completed, a.timestamp, "
+        "a.completed_at, a.assigned_by_admin, u.data_version "
+        "FROM task_archive a JOIN \"user\" u ON u.id = a.user_id"
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_task_completed_at', table_name='task',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_index('ix_task_archive_user_timestamp', table_name='task_archive')
+    op.drop_table('task_archive')
@@ -1,4 +1,7 @@
-from backend.app import app, db
+from backend.app import create_app
+from backend.extensions import db
+
+app = create_app()
 
 with app.app_context():
     db.drop_all()
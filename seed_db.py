@@ -1,7 +1,11 @@
-from backend.app import app, db, User
+from backend.app import create_app
+from backend.extensions import db
+from backend.models import User
 from werkzeug.security import generate_password_hash
 from sqlalchemy.exc import IntegrityError
 
+app = create_app()
+
 ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "password"  
 